@@ -3,25 +3,44 @@ Debate Manager: Orchestrates multi-agent debates and consensus building.
 This is the core intelligence that makes agents actually discuss and negotiate.
 """
 
-from typing import List, Dict, Any
+import asyncio
+import json
+from typing import List, Dict, Any, Tuple, Optional, Callable, Union
 from app.agents.debate_types import (
     DebateMessage, DebateState, ProductProposal, 
     ProductChallenge, ConsensusResult
 )
+from app.services.metrics import llm_config
+from app.services.records import Product
+from app.services.identity import CompiledIdentity, compile_identity
+from app.services.tracing import span
 from langchain_openai import ChatOpenAI
 import os
 
+# Proposals debated at once; each may make an LLM call for its defense
+DEBATE_MAX_CONCURRENCY = int(os.getenv("DEBATE_MAX_CONCURRENCY", "4"))
+
+# Defend every challenged proposal in one LLM request instead of one each
+DEBATE_BATCH_DEFENSES = os.getenv("DEBATE_BATCH_DEFENSES", "true").lower() == "true"
+
 class DebateManager:
     """Manages the debate process between agents."""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(
+        self,
+        llm: ChatOpenAI,
+        max_concurrency: int = DEBATE_MAX_CONCURRENCY,
+        batch_defenses: bool = DEBATE_BATCH_DEFENSES
+    ):
         self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.batch_defenses = batch_defenses
         
     async def facilitate_product_debate(
         self,
         proposals: List[ProductProposal],
-        user_identity: Dict[str, Any]
-    ) -> List[ConsensusResult]:
+        user_identity: Union[Dict[str, Any], CompiledIdentity]
+    ) -> Tuple[List[ConsensusResult], List[DebateMessage]]:
         """
         Orchestrates a debate about proposed products.
         
@@ -31,112 +50,185 @@ class DebateManager:
         3. Proposing agents defend their choices
         4. Group negotiates to consensus
         5. Final products are approved or rejected
+        
+        Proposals are independent, so they are debated concurrently (up to
+        max_concurrency at once); the transcript is reassembled in proposal
+        order afterwards so the output is deterministic.
+        
+        With batch_defenses, all challenged proposals in the round are
+        defended by a single LLM request.
         """
         
+        user_identity = compile_identity(user_identity)
+        with span("debate", proposals=len(proposals), batch_defenses=self.batch_defenses) as s:
+            consensus_results, debate_messages = await self._run_debate(proposals, user_identity)
+            s.set(approved=sum(1 for c in consensus_results if c.approved))
+        
+        return consensus_results, debate_messages
+    
+    async def _run_debate(
+        self,
+        proposals: List[ProductProposal],
+        user_identity: CompiledIdentity
+    ) -> Tuple[List[ConsensusResult], List[DebateMessage]]:
+        """Debate every proposal; see facilitate_product_debate."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def with_limit(coro):
+            async with semaphore:
+                return await coro
+        
+        if self.batch_defenses:
+            all_challenges = await asyncio.gather(*[
+                with_limit(self._get_challenges(proposal, user_identity)) for proposal in proposals
+            ])
+            # Keyed by position: the same product can be proposed by more than one agent
+            challenged = [
+                (index, proposal, challenges)
+                for index, (proposal, challenges) in enumerate(zip(proposals, all_challenges)) if challenges
+            ]
+            defenses = await self._get_defenses_batched(challenged, user_identity, with_limit)
+            outcomes = [
+                await self._conclude_proposal(
+                    proposal, challenges, defenses.get(index), user_identity
+                )
+                for index, (proposal, challenges) in enumerate(zip(proposals, all_challenges))
+            ]
+        else:
+            outcomes = await asyncio.gather(*[
+                with_limit(self._debate_proposal(proposal, user_identity)) for proposal in proposals
+            ])
+        
+        consensus_results = [consensus for consensus, _ in outcomes]
+        debate_messages = [message for _, messages in outcomes for message in messages]
+        
+        return consensus_results, debate_messages
+    
+    async def _debate_proposal(
+        self,
+        proposal: ProductProposal,
+        user_identity: CompiledIdentity
+    ) -> Tuple[ConsensusResult, List[DebateMessage]]:
+        """Run one proposal through challenge, defense and consensus."""
+        with span("debate.proposal", product_id=proposal.product_id, agent=proposal.proposing_agent):
+            challenges = await self._get_challenges(proposal, user_identity)
+            
+            defense = None
+            if challenges:
+                defense = await self._get_defense(proposal, challenges, user_identity)
+            
+            return await self._conclude_proposal(proposal, challenges, defense, user_identity)
+    
+    async def _conclude_proposal(
+        self,
+        proposal: ProductProposal,
+        challenges: List[ProductChallenge],
+        defense: Optional[str],
+        user_identity: CompiledIdentity
+    ) -> Tuple[ConsensusResult, List[DebateMessage]]:
+        """Build consensus for a debated proposal and its transcript."""
         debate_messages = []
-        consensus_results = []
         
-        for proposal in proposals:
-            # Step 1: Announce proposal
+        # Step 1: Announce proposal
+        debate_messages.append(DebateMessage(
+            agent=proposal.proposing_agent,
+            message_type="PROPOSAL",
+            product_id=proposal.product_id,
+            reasoning=f"I propose {proposal.product.name}: {', '.join(proposal.reasons)}",
+            confidence=proposal.confidence
+        ))
+        
+        # Step 2: Challenges from other agents
+        for challenge in challenges:
+            debate_messages.append(DebateMessage(
+                agent=challenge.challenging_agent,
+                message_type="CHALLENGE",
+                product_id=proposal.product_id,
+                reasoning=challenge.reason,
+                confidence=0.7 if challenge.severity == "critical" else 0.4
+            ))
+        
+        # Step 3: Defense, if challenged
+        if challenges:
             debate_messages.append(DebateMessage(
                 agent=proposal.proposing_agent,
-                message_type="PROPOSAL",
+                message_type="DEFENSE",
                 product_id=proposal.product_id,
-                reasoning=f"I propose {proposal.product['name']}: {', '.join(proposal.reasons)}",
+                reasoning=defense,
                 confidence=proposal.confidence
             ))
-            
-            # Step 2: Get challenges from other agents
-            challenges = await self._get_challenges(proposal, user_identity)
-            
-            for challenge in challenges:
-                debate_messages.append(DebateMessage(
-                    agent=challenge.challenging_agent,
-                    message_type="CHALLENGE",
-                    product_id=proposal.product_id,
-                    reasoning=challenge.reason,
-                    confidence=0.7 if challenge.severity == "critical" else 0.4
-                ))
-            
-            # Step 3: If challenged, get defense
-            if challenges:
-                defense = await self._get_defense(proposal, challenges, user_identity)
-                debate_messages.append(DebateMessage(
-                    agent=proposal.proposing_agent,
-                    message_type="DEFENSE",
-                    product_id=proposal.product_id,
-                    reasoning=defense,
-                    confidence=proposal.confidence
-                ))
-            
-            # Step 4: Build consensus
+        
+        # Step 4: Build consensus
+        with span("debate.consensus", product_id=proposal.product_id, challenges=len(challenges)) as s:
             consensus = await self._build_consensus(
                 proposal, 
                 challenges, 
                 user_identity
             )
-            consensus_results.append(consensus)
-            
-            # Log consensus decision
-            if consensus.approved:
-                debate_messages.append(DebateMessage(
-                    agent="System",
-                    message_type="CONSENSUS",
-                    product_id=proposal.product_id,
-                    reasoning=f"✅ APPROVED by {len(consensus.supporting_agents)}/4 agents. {consensus.negotiation_summary}",
-                    confidence=consensus.final_confidence
-                ))
-            else:
-                debate_messages.append(DebateMessage(
-                    agent="System",
-                    message_type="CONSENSUS",
-                    product_id=proposal.product_id,
-                    reasoning=f"❌ REJECTED by majority. {consensus.negotiation_summary}",
-                    confidence=1.0 - consensus.final_confidence
-                ))
+            s.set(approved=consensus.approved)
         
-        return consensus_results, debate_messages
+        # Log consensus decision
+        if consensus.approved:
+            debate_messages.append(DebateMessage(
+                agent="System",
+                message_type="CONSENSUS",
+                product_id=proposal.product_id,
+                reasoning=f"✅ APPROVED by {len(consensus.supporting_agents)}/4 agents. {consensus.negotiation_summary}",
+                confidence=consensus.final_confidence
+            ))
+        else:
+            debate_messages.append(DebateMessage(
+                agent="System",
+                message_type="CONSENSUS",
+                product_id=proposal.product_id,
+                reasoning=f"❌ REJECTED by majority. {consensus.negotiation_summary}",
+                confidence=1.0 - consensus.final_confidence
+            ))
+        
+        return consensus, debate_messages
     
     async def _get_challenges(
         self,
         proposal: ProductProposal,
-        user_identity: Dict[str, Any]
+        user_identity: CompiledIdentity
     ) -> List[ProductChallenge]:
         """
         Have other agents evaluate and potentially challenge a proposal.
         """
-        challenges = []
-        product = proposal.product
-        
-        # Critic challenges based on value
-        if proposal.proposing_agent != "Critic":
-            critic_challenge = await self._critic_evaluate(product, user_identity)
-            if critic_challenge:
-                challenges.append(ProductChallenge(
-                    product_id=proposal.product_id,
-                    challenging_agent="Critic",
-                    reason=critic_challenge,
-                    severity="moderate"
-                ))
-        
-        # Guardian challenges based on ethics
-        if proposal.proposing_agent != "Guardian":
-            guardian_challenge = await self._guardian_evaluate(product, user_identity)
-            if guardian_challenge:
-                challenges.append(ProductChallenge(
-                    product_id=proposal.product_id,
-                    challenging_agent="Guardian",
-                    reason=guardian_challenge,
-                    severity="critical" if "repairability" in guardian_challenge.lower() else "moderate"
-                ))
+        with span("debate.challenges", product_id=proposal.product_id, agent=proposal.proposing_agent) as s:
+            challenges = []
+            product = proposal.product
+        
+            # Critic challenges based on value
+            if proposal.proposing_agent != "Critic":
+                critic_challenge = await self._critic_evaluate(product, user_identity)
+                if critic_challenge:
+                    challenges.append(ProductChallenge(
+                        product_id=proposal.product_id,
+                        challenging_agent="Critic",
+                        reason=critic_challenge,
+                        severity="moderate"
+                    ))
+        
+            # Guardian challenges based on ethics
+            if proposal.proposing_agent != "Guardian":
+                guardian_challenge = await self._guardian_evaluate(product, user_identity)
+                if guardian_challenge:
+                    challenges.append(ProductChallenge(
+                        product_id=proposal.product_id,
+                        challenging_agent="Guardian",
+                        reason=guardian_challenge,
+                        severity="critical" if "repairability" in guardian_challenge.lower() else "moderate"
+                    ))
+            s.set(challenges=len(challenges))
         
         return challenges
     
-    async def _critic_evaluate(self, product: Dict, user_identity: Dict) -> str:
+    async def _critic_evaluate(self, product: Product, user_identity: CompiledIdentity) -> str:
         """Critic evaluates if product is good value."""
-        price = product.get("price", 0)
-        budget = user_identity.get("budget", 1000)
-        perf_score = product.get("specs", {}).get("perf_score", 5)
+        price = product.price
+        budget = user_identity.value_budget
+        perf_score = product.specs.get("perf_score", 5)
         
         # Challenge if price is >80% of budget but performance is <7
         if price > budget * 0.8 and perf_score < 7:
@@ -148,16 +240,15 @@ class DebateManager:
         
         return ""
     
-    async def _guardian_evaluate(self, product: Dict, user_identity: Dict) -> str:
+    async def _guardian_evaluate(self, product: Product, user_identity: CompiledIdentity) -> str:
         """Guardian evaluates ethical concerns."""
-        repair_score = product.get("repairability_score", 5)
-        user_values = user_identity.get("values", [])
+        repair_score = product.repairability_score
         
         # Challenge if user values repairability but product scores low
-        if "Repairability" in user_values and repair_score < 5:
+        if user_identity.values_repairability and repair_score < 5:
             return f"User values Right to Repair, but this product scores {repair_score}/10 in repairability. This conflicts with their ethics."
         
-        if "Eco" in user_values and "eco" not in product.get("tags", []):
+        if user_identity.values_eco and "eco" not in product.tags:
             return f"User values eco-friendliness, but this product lacks environmental certifications."
         
         return ""
@@ -166,7 +257,7 @@ class DebateManager:
         self,
         proposal: ProductProposal,
         challenges: List[ProductChallenge],
-        user_identity: Dict
+        user_identity: CompiledIdentity
     ) -> str:
         """Get the proposing agent's defense against challenges."""
         
@@ -178,7 +269,7 @@ class DebateManager:
         prompt = f"""
 You are the {proposal.proposing_agent} agent defending your product recommendation.
 
-Product: {proposal.product['name']}
+Product: {proposal.product.name}
 Your reasoning: {', '.join(proposal.reasons)}
 
 Challenges raised:
@@ -188,14 +279,84 @@ Provide a brief, compelling defense (2-3 sentences) addressing these concerns wh
 If the challenges are valid, acknowledge them but explain why the product is still worth considering.
 """
         
-        response = self.llm.invoke(prompt)
+        # Async so concurrent proposals overlap their LLM round-trips
+        with span("debate.defense", product_id=proposal.product_id, challenges=len(challenges)):
+            response = await self.llm.ainvoke(prompt, config=llm_config("debate_defense"))
         return response.content.strip()
     
+    async def _get_defenses_batched(
+        self,
+        challenged: List[Tuple[int, ProductProposal, List[ProductChallenge]]],
+        user_identity: CompiledIdentity,
+        with_limit: Callable
+    ) -> Dict[int, str]:
+        """
+        Get defenses for every challenged proposal in one LLM request.
+        
+        Returns defenses keyed by proposal index. Any proposal the batched
+        response doesn't cover (or every proposal, if it can't be parsed)
+        falls back to an individual _get_defense call.
+        """
+        if not challenged:
+            return {}
+        
+        sections = "\n\n".join([
+            f"""[{index}]
+Agent: {proposal.proposing_agent}
+Product: {proposal.product.name}
+Reasoning: {', '.join(proposal.reasons)}
+Challenges raised:
+""" + "\n".join([f"- {c.challenging_agent}: {c.reason}" for c in challenges])
+            for index, proposal, challenges in challenged
+        ])
+        
+        prompt = f"""
+You are each proposing agent defending its product recommendation.
+
+{sections}
+
+For each proposal, provide a brief, compelling defense (2-3 sentences) from the proposing agent addressing its challenges while staying true to that agent's role.
+If the challenges are valid, acknowledge them but explain why the product is still worth considering.
+
+Return ONLY valid JSON mapping each proposal number in brackets to its defense, e.g. {{"0": "defense text"}}
+"""
+        
+        expected = {str(index): index for index, _, _ in challenged}
+        defenses = {}
+        with span("debate.defenses_batched", proposals=len(challenged)) as s:
+            try:
+                response = await self.llm.ainvoke(prompt, config=llm_config("debate_defense"))
+                content = response.content.strip().replace("```json", "").replace("```", "").strip()
+                parsed = json.loads(content)
+                if isinstance(parsed, dict):
+                    defenses = {
+                        expected[str(key).strip("[] ")]: defense.strip()
+                        for key, defense in parsed.items()
+                        if str(key).strip("[] ") in expected
+                        and isinstance(defense, str) and defense.strip()
+                    }
+            except Exception as e:
+                print(f"Batched defense error: {e}")
+            s.set(parsed=len(defenses))
+        
+        missing = [
+            (index, proposal, challenges) for index, proposal, challenges in challenged
+            if index not in defenses
+        ]
+        fallbacks = await asyncio.gather(*[
+            with_limit(self._get_defense(proposal, challenges, user_identity))
+            for _, proposal, challenges in missing
+        ])
+        for (index, _, _), defense in zip(missing, fallbacks):
+            defenses[index] = defense
+        
+        return defenses
+    
     async def _build_consensus(
         self,
         proposal: ProductProposal,
         challenges: List[ProductChallenge],
-        user_identity: Dict
+        user_identity: CompiledIdentity
     ) -> ConsensusResult:
         """
         Determine if product should be approved based on debate.
@@ -1,7 +1,9 @@
 from typing import TypedDict, List, Dict, Any, Literal, Annotated
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 import operator
+from app.services.records import Product
+from app.services.identity import CompiledIdentity
 
 # Debate Message Types
 class DebateMessage(BaseModel):
@@ -23,7 +25,8 @@ class DebateState(TypedDict):
     """Extended state for debate tracking."""
     messages: List[Any]  # LangChain messages
     user_identity: Dict[str, Any]
-    products: List[Dict[str, Any]]
+    profile: CompiledIdentity
+    products: List[Product]
     logs: Annotated[List[Dict[str, Any]], operator.add]  # FIXED: Now appends instead of replaces
     debate_messages: List[DebateMessage]  # NEW: Structured debate messages
     proposals: Dict[str, List[str]]  # agent -> list of product IDs they propose
@@ -33,8 +36,10 @@ class DebateState(TypedDict):
 
 class ProductProposal(BaseModel):
     """A product proposed by an agent."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     product_id: str
-    product: Dict[str, Any]
+    product: Product
     proposing_agent: str
     reasons: List[str]
     confidence: float
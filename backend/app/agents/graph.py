@@ -1,60 +1,56 @@
-import json
+import asyncio
 import os
+import re
 from typing import TypedDict, Annotated, List, Dict, Any
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, message_chunk_to_message
 from langchain_openai import ChatOpenAI
 import operator
+from app.agents.scoring import (
+    product_arrays, repairability_array, critic_scores, guardian_scores, to_analysis
+)
+from app.agents.ranking import top_k, SCOUT_CANDIDATES
+from app.services.title_classifier import classify_title
+from app.services.spec_parser import parse_spec_requirements, meets_requirements
+from app.services.metrics import observe_node, llm_config
+from app.services.tracing import span
+from app.services.records import Product, ProductAnalysis
+from app.services.identity import CompiledIdentity
 
 # --- State Definition ---
+def merge_analysis(left: Dict[str, ProductAnalysis], right: Dict[str, ProductAnalysis]) -> Dict[str, ProductAnalysis]:
+    """Merge per-product analysis written by parallel evaluator nodes"""
+    merged = dict(left or {})
+    for p_id, fields in (right or {}).items():
+        merged[p_id] = merged[p_id].merged(fields) if p_id in merged else fields
+    return merged
+
 class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], operator.add]
     user_identity: Dict[str, Any]
-    products: List[Dict[str, Any]]
+    profile: CompiledIdentity  # compiled once from user_identity at the API boundary
+    products: List[Product]
     logs: Annotated[List[Dict[str, Any]], operator.add]
-    product_analysis: Dict[str, Any] 
-
-# Static product fallback data
-try:
-    with open("data/products.json", "r") as f:
-        PRODUCT_DB = json.load(f)
-except FileNotFoundError:
-    PRODUCT_DB = []
+    product_analysis: Annotated[Dict[str, ProductAnalysis], merge_analysis]
 
 # LLM setup
 llm = ChatOpenAI(
     model="openai/gpt-4o-mini", 
     temperature=0.7,
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY")
+    base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    api_key=os.getenv("OPENROUTER_API_KEY"),
+    stream_usage=True  # Token counts for /metrics
 )
 
 
 
-def scout_node(state: AgentState):
+async def scout_node(state: AgentState):
     """Find and filter products based on query and budget"""
     query_msg = state["messages"][0].content.lower()
-    user_identity = state["user_identity"]
-    # Robust budget handling
-    raw_budget = user_identity.get("budget", 10000)
-    try:
-        if isinstance(raw_budget, dict):
-             # Identity profile uses "maximum" and "preferred" keys
-             max_budget = raw_budget.get("maximum")
-             pref_budget = raw_budget.get("preferred")
-             # Use maximum if it exists and is > 0, otherwise use preferred, otherwise default
-             if max_budget and max_budget > 0:
-                 budget = int(max_budget)
-             elif pref_budget and pref_budget > 0:
-                 budget = int(pref_budget)
-             else:
-                 budget = 10000
-        else:
-             budget = int(raw_budget) if raw_budget else 10000
-    except (ValueError, TypeError):
-        budget = 10000
+    budget = state["profile"].search_budget
     
     logs = []
+    optimized_query = query_msg
     
     # Add premium keywords for high-budget tech searches
     tech_keywords = ["laptop", "computer", "phone", "monitor", "tv", "camera", "headphone", "watch", "tablet"]
@@ -74,10 +70,10 @@ def scout_node(state: AgentState):
     # if optimized_query != query_msg:
     #     logs.append(...) 
 
-    from app.services.product_search import search_products
+    from app.services.product_search import find_products, active_search_backend
     
-    print(f"🔍 Scout: Searching real-time for '{optimized_query}'")
-    all_products = search_products(optimized_query, max_results=20)
+    print(f"🔍 Scout: Searching ({active_search_backend()}) for '{optimized_query}'")
+    all_products = await find_products(optimized_query, max_results=SCOUT_CANDIDATES)
     
     if not all_products:
         print("❌ No products found from API")
@@ -102,25 +98,49 @@ def scout_node(state: AgentState):
     hard_cap = budget * 1.5 
     min_price = budget * 0.15 if budget > 1000 else 0 
     
+    found_products = []
+    
     # Strict filtering pass
     for p in all_products:
-        price = p.get("price", 0)
+        price = p.price
         if min_price <= price <= strict_cap:
             found_products.append(p)
             
-        # Relaxed filtering if needed
+    # Relaxed filtering if needed
+    if not found_products:
         logs.append({
             "agent": "Scout",
             "color": "blue",
             "message": "Strict filtering yielded 0 results. Checking slightly above budget..."
         })
         for p in all_products:
-            price = p.get("price", 0)
+            price = p.price
             if price <= hard_cap:
                 found_products.append(p)
     
     
-    found_products = found_products[:8]
+    # Numeric spec requirements stated in the query (e.g. "16gb ram")
+    requirements = parse_spec_requirements(query_msg)
+    if requirements and found_products:
+        meeting = [p for p in found_products if meets_requirements(p.spec_values, requirements)]
+        if meeting:
+            if len(meeting) < len(found_products):
+                logs.append({
+                    "agent": "Scout",
+                    "color": "blue",
+                    "message": f"Dropped {len(found_products) - len(meeting)} items below the requested specs."
+                })
+            found_products = meeting
+    
+    # Best matches by budget fit, rating, query overlap and repairability
+    eligible = len(found_products)
+    found_products = top_k(found_products, query_msg, budget)
+    if eligible > len(found_products):
+        logs.append({
+            "agent": "Scout",
+            "color": "blue",
+            "message": f"Ranked {eligible} eligible items; keeping the top {len(found_products)}."
+        })
     
     if found_products:
         logs.append({
@@ -144,7 +164,7 @@ def scout_node(state: AgentState):
 def critic_node(state: AgentState):
     """Analyze price-to-performance and value"""
     products = state["products"]
-    identity = state["user_identity"]
+    budget = state["profile"].value_budget
     
     logs = []
     logs.append({
@@ -153,73 +173,36 @@ def critic_node(state: AgentState):
         "message": f"Initiating value analysis on {len(products)} candidates..."
     })
     
-    # Robust budget handling
-    raw_budget = identity.get("budget", 1000)
-    try:
-        if isinstance(raw_budget, dict):
-             # Identity profile uses "maximum" and "preferred" keys
-             max_budget = raw_budget.get("maximum")
-             pref_budget = raw_budget.get("preferred")
-             # Use maximum if it exists and is > 0, otherwise use preferred, otherwise default
-             if max_budget and max_budget > 0:
-                 budget = int(max_budget)
-             elif pref_budget and pref_budget > 0:
-                 budget = int(pref_budget)
-             else:
-                 budget = 1000
-        else:
-             budget = int(raw_budget) if raw_budget else 1000
-    except (ValueError, TypeError):
-        budget = 1000
-    
-    analysis = state.get("product_analysis", {})
-    
+    # Score the whole batch at once; see app/agents/scoring.py
+    prices, repairability, flags = product_arrays(products)
+    scores = critic_scores(prices, repairability, flags, budget)
+    # Only this node's fields; merge_analysis combines them with other evaluators
+    analysis = to_analysis(products, scores)
+    logs.extend(critic_findings(products, scores["value_score"].tolist()))
+
+    return {
+        "product_analysis": analysis,
+        "logs": logs
+    }
+
+def critic_findings(products: List[Product], value_scores: List[int]) -> List[Dict[str, Any]]:
+    """Critic log entries for poor-value and standout products"""
+    logs = []
     rejected_count = 0
     
-    for p in products:
-        p_id = p.get("id")
-        if p_id not in analysis:
-            analysis[p_id] = {}
-            
-        # Calculate value score
-        price_ratio = p["price"] / (budget * 1.2)
-        base_score = max(0, 100 - (price_ratio * 80)) # cheaper is better base
-        repaired_score = (base_score + (p["repairability_score"] * 2)) 
-        final_value_score = min(100, int(repaired_score))
-        
-        analysis[p_id]["value_score"] = final_value_score
-        
-        # Estimate hidden costs
-        name = p["name"].lower()
-        hidden_cost = "Low"
-        if any(b in name for b in ["apple", "macbook", "printer", "subscription"]):
-            hidden_cost = "High"
-        elif any(b in name for b in ["razer", "alienware", "sony"]):
-            hidden_cost = "Medium"
-            
-        analysis[p_id]["hidden_cost_risk"] = hidden_cost
-        
-        # Deal timing heuristic
-        deal_timing = "Buy Now"
-        if "renewed" in name or "refurbished" in name:
-             deal_timing = "Great Price"
-        elif "2024" in name or "latest" in name:
-             deal_timing = "Wait (New Release)"
-             
-        analysis[p_id]["deal_timing"] = deal_timing
-
+    for p, final_value_score in zip(products, value_scores):
         if final_value_score < 40:
              logs.append({
                 "agent": "Critic",
                 "color": "red",
-                "message": f"Critic Warning: {p['name']} has poor value score ({final_value_score}/100)."
+                "message": f"Critic Warning: {p.name} has poor value score ({final_value_score}/100)."
             })
              rejected_count += 1
         elif final_value_score > 85:
              logs.append({
                 "agent": "Critic",
                 "color": "green",
-                "message": f"Value Pick: {p['name']} offers exceptional specs for the price."
+                "message": f"Value Pick: {p.name} offers exceptional specs for the price."
             })
             
     if rejected_count == 0:
@@ -234,16 +217,11 @@ def critic_node(state: AgentState):
             "color": "orange",
             "message": f"Flagged {rejected_count} items as poor value propositions."
         })
-
-    return {
-        "product_analysis": analysis,
-        "logs": logs
-    }
+    return logs
 
 def guardian_node(state: AgentState):
     """Check repairability and sustainability"""
     products = state["products"]
-    analysis = state.get("product_analysis", {})
     
     logs = []
     logs.append({
@@ -252,32 +230,22 @@ def guardian_node(state: AgentState):
         "message": f"Scanning {len(products)} products for ethical and repairability standards..."
     })
     
+    analysis = to_analysis(products, guardian_scores(repairability_array(products)))
+    logs.extend(guardian_findings(products))
+
+    return {"product_analysis": analysis, "logs": logs}
+
+def guardian_findings(products: List[Product]) -> List[Dict[str, Any]]:
+    """Guardian log entries for hard-to-repair products"""
+    logs = []
     issues_found = 0
     
     for p in products:
-        p_id = p.get("id")
-        if p_id not in analysis: analysis[p_id] = {}
-        
-        # Repairability confidence
-        score = p["repairability_score"]
-        confidence = "Low"
-        if score >= 7: confidence = "High"
-        elif score >= 5: confidence = "Medium"
-        
-        analysis[p_id]["repairability_confidence"] = confidence
-        
-        # Estimate longevity
-        longevity = "3-4 Years"
-        if score >= 8: longevity = "5+ Years (Upgradeable)"
-        elif score <= 3: longevity = "2-3 Years (Disposable)"
-        
-        analysis[p_id]["longevity_score"] = longevity
-        
-        if score < 4:
+        if p.repairability_score < 4:
              logs.append({
                 "agent": "Guardian",
                 "color": "green",
-                "message": f"Planned Obsolescence Alert: {p['name']} is hard to repair."
+                "message": f"Planned Obsolescence Alert: {p.name} is hard to repair."
             })
              issues_found += 1
     
@@ -293,37 +261,43 @@ def guardian_node(state: AgentState):
             "color": "green",
             "message": f"Identified {issues_found} potential sustainability risks."
         })
+    return logs
 
-    return {"product_analysis": analysis, "logs": logs}
-
-def mentor_node(state: AgentState):
-    """Explain specs and generate final recommendation"""
-    products = state["products"]
-    identity = state["user_identity"]
-    query_msg = state["messages"][-1].content
-    analysis = state.get("product_analysis", {})
-    role = identity.get("role", "User").lower()
-    
-    # Calculate cognitive load for each product
+def cognitive_loads(products: List[Product], profile: CompiledIdentity) -> Dict[str, ProductAnalysis]:
+    """Mentor's cognitive_load for each product, given the user's role"""
+    loads = {}
     for p in products:
-        p_id = p.get("id")
-        if p_id not in analysis:
-            analysis[p_id] = {}
-        name = p["name"].lower()
+        hint = classify_title(p.name).cognitive_hint
         
         load = "Medium"
-        if "pro" in name or "developer" in name or "linux" in name:
-            load = "High" if "dev" not in role and "eng" not in role else "Low"
-        elif "macbook" in name or "console" in name or "iphone" in name:
+        if hint == "technical":
+            load = "Low" if profile.technical_role else "High"
+        elif hint == "simple":
             load = "Low"
             
-        analysis[p_id]["cognitive_load"] = load
-    
-    # Merge analysis data into products
+        loads[p.id] = ProductAnalysis(cognitive_load=load)
+    return loads
+
+def attach_analysis(products: List[Product], analysis: Dict[str, ProductAnalysis]):
+    """Attach merged analysis records to their products"""
     for p in products:
-        p_id = p.get("id")
-        if p_id in analysis:
-            p.update(analysis[p_id])
+        if p.id in analysis:
+            p.analysis = analysis[p.id]
+
+def summarize_products(products: List[Product]) -> str:
+    """One prompt line per product: name, price, value score and specs"""
+    return "\n".join([
+        f"- {p.name} (${p.price}) [Value: {p.analysis.value_score if p.analysis and p.analysis.value_score is not None else 'N/A'}/100]" + 
+        (f": {', '.join([f'{k}: {v}' for k, v in p.specs.items()])}" if p.specs else " (Specs: See product details)")
+        for p in products
+    ])
+
+async def mentor_node(state: AgentState):
+    """Explain specs and generate final recommendation"""
+    products = state["products"]
+    profile = state["profile"]
+    query_msg = state["messages"][-1].content
+    attach_analysis(products, merge_analysis(state.get("product_analysis", {}), cognitive_loads(products, profile)))
 
     if not products:
         return {
@@ -331,15 +305,11 @@ def mentor_node(state: AgentState):
             "logs": [{"agent": "Mentor", "color": "purple", "message": "No products survived the filtering process."}]
         }
         
-    product_summaries = "\n".join([
-        f"- {p['name']} (${p['price']}) [Value: {p.get('value_score', 'N/A')}/100]" + 
-        (f": {', '.join([f'{k}: {v}' for k, v in p.get('specs', {}).items()])}" if isinstance(p.get('specs'), dict) and p.get('specs') else " (Specs: See product details)")
-        for p in products
-    ])
+    product_summaries = summarize_products(products)
     
     prompt = f"""
     You are 'The Mentor', a helpful tech expert.
-    User Identity: {identity.get('role', 'User')}
+    User Identity: {profile.role}
     User Query: "{query_msg}"
     
     Your Goal: Answer the user's question directly using the selected products as examples.
@@ -355,11 +325,16 @@ def mentor_node(state: AgentState):
     {product_summaries}
     """
     
-    # Generate response
-    response = llm.invoke([HumanMessage(content=prompt)])
+    # Stream the response without blocking the event loop; each chunk is
+    # surfaced to graph.astream(stream_mode="messages") as it arrives
+    # Keep the streamed message (and its id) so the messages stream mode
+    # doesn't emit the finished reply again as a new message
+    reply = None
+    async for chunk in llm.astream([HumanMessage(content=prompt)], config=llm_config("mentor")):
+        reply = chunk if reply is None else reply + chunk
     
     return {
-        "messages": [response],
+        "messages": [message_chunk_to_message(reply) if reply is not None else AIMessage(content="")],
         "products": products, 
         "logs": [{"agent": "Mentor", "color": "purple", "message": f"Synthesizing final advice based on {len(products)} verified options..."}]
     }
@@ -367,16 +342,141 @@ def mentor_node(state: AgentState):
 # Graph construction
 workflow = StateGraph(AgentState)
 
-workflow.add_node("scout", scout_node)
-workflow.add_node("critic", critic_node)
-workflow.add_node("guardian", guardian_node)
-workflow.add_node("mentor", mentor_node)
+workflow.add_node("scout", observe_node("scout")(scout_node))
+workflow.add_node("critic", observe_node("critic")(critic_node))
+workflow.add_node("guardian", observe_node("guardian")(guardian_node))
+workflow.add_node("mentor", observe_node("mentor")(mentor_node))
 
 workflow.set_entry_point("scout")
 
+# Evaluators fan out from scout and join before mentor
 workflow.add_edge("scout", "critic")
-workflow.add_edge("critic", "guardian")
-workflow.add_edge("guardian", "mentor")
+workflow.add_edge("scout", "guardian")
+workflow.add_edge(["critic", "guardian"], "mentor")
 workflow.add_edge("mentor", END)
 
 graph = workflow.compile()
+
+# --- Batch pipeline ---
+# Several queries for one identity (e.g. a comparison page): Scout searches
+# run concurrently, Critic and Guardian score every candidate in one
+# vectorized pass, and a single Mentor generation writes one section per query.
+
+BATCH_SECTION_RE = re.compile(r"^\s*\[\[SECTION (\d+)\]\]\s*$", re.MULTILINE)
+
+NO_PRODUCTS_REPLY = "I couldn't find any products that matched your strict criteria. Try increasing your budget or broadening your search!"
+
+batch_scout = observe_node("scout")(scout_node)
+
+def split_sections(content: str, count: int) -> List[str]:
+    """Split a batch Mentor reply on its [[SECTION n]] markers (1-based); missing sections are empty"""
+    sections = [""] * count
+    matches = list(BATCH_SECTION_RE.finditer(content))
+    for i, match in enumerate(matches):
+        index = int(match.group(1)) - 1
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        if 0 <= index < count:
+            sections[index] = content[match.end():end].strip()
+    return sections
+
+async def run_batch(queries: List[str], identity: Dict[str, Any], profile: CompiledIdentity) -> Dict[str, Any]:
+    """
+    Run the pipeline for several queries sharing one identity.
+
+    Returns {"results": [{"query", "products", "logs", "final_response"}],
+    "logs": [...], "final_response": str}, results in query order.
+    """
+    with span("batch.scout", queries=len(queries)):
+        scouted = await asyncio.gather(*(
+            batch_scout({
+                "messages": [HumanMessage(content=query)],
+                "user_identity": identity,
+                "profile": profile,
+                "products": [],
+                "logs": []
+            })
+            for query in queries
+        ))
+
+    results = [
+        {"query": query, "products": update["products"], "logs": list(update["logs"]), "final_response": ""}
+        for query, update in zip(queries, scouted)
+    ]
+    candidates = [p for result in results for p in result["products"]]
+    logs = [{
+        "agent": "Critic",
+        "color": "orange",
+        "message": f"Initiating value analysis on {len(candidates)} candidates across {len(queries)} searches..."
+    }]
+
+    if candidates:
+        with span("batch.analysis", products=len(candidates)):
+            prices, repairability, flags = product_arrays(candidates)
+            scores = {
+                **critic_scores(prices, repairability, flags, profile.value_budget),
+                **guardian_scores(repairability)
+            }
+            # Score arrays follow the candidates list; slice them back per query.
+            # Product ids are only unique within one search, so analysis is keyed per query.
+            start = 0
+            for result in results:
+                products = result["products"]
+                end = start + len(products)
+                if products:
+                    segment = {field: values[start:end] for field, values in scores.items()}
+                    analysis = merge_analysis(to_analysis(products, segment), cognitive_loads(products, profile))
+                    attach_analysis(products, analysis)
+                    result["logs"].extend(critic_findings(products, segment["value_score"].tolist()))
+                    result["logs"].extend(guardian_findings(products))
+                start = end
+
+    answered = [(i, result) for i, result in enumerate(results) if result["products"]]
+    for result in results:
+        if not result["products"]:
+            result["final_response"] = NO_PRODUCTS_REPLY
+
+    if not answered:
+        logs.append({"agent": "Mentor", "color": "purple", "message": "No products survived the filtering process."})
+        return {"results": results, "logs": logs, "final_response": NO_PRODUCTS_REPLY}
+
+    sections_prompt = "\n\n".join(
+        f"[[SECTION {n}]]\nUser Query: \"{result['query']}\"\nSelected Products:\n{summarize_products(result['products'])}"
+        for n, (_, result) in enumerate(answered, 1)
+    )
+    prompt = f"""
+    You are 'The Mentor', a helpful tech expert.
+    User Identity: {profile.role}
+    
+    The user searched for several things at once. Answer each search separately, using its
+    selected products as examples. Do NOT just list the products again. Explain WHY these
+    specific items match that request.
+    
+    - Be conversational and encouraging.
+    - Mention specific metrics if relevant (e.g. "This has a high value score of 95/100").
+    - FORMATTING: Use Markdown bullet points (-) for clarity.
+    - Start each answer with its marker line exactly as given (e.g. [[SECTION 1]]) and write
+      nothing before the first marker.
+    
+    {sections_prompt}
+    """
+
+    with span("batch.mentor", sections=len(answered)):
+        response = await llm.ainvoke([HumanMessage(content=prompt)], config=llm_config("mentor_batch"))
+    content = response.content
+    full_response = BATCH_SECTION_RE.sub("", content).strip()
+
+    sections = split_sections(content, len(answered))
+    for (_, result), section in zip(answered, sections):
+        # An unparseable reply still reaches the user, just not split per query
+        result["final_response"] = section or full_response
+
+    logs.append({
+        "agent": "Mentor",
+        "color": "purple",
+        "message": f"Synthesizing advice for {len(answered)} searches based on {len(candidates)} verified options..."
+    })
+    return {
+        "results": results,
+        "logs": logs,
+        "final_response": full_response
+    }
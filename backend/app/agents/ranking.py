@@ -0,0 +1,110 @@
+"""Relevance ranking for Scout candidates: score each product, keep the top k"""
+
+import heapq
+import os
+from typing import List, Dict, Iterable, Set
+
+from app.services.local_search import tokenize
+from app.services.records import Product
+
+SCOUT_TOP_K = int(os.getenv("SCOUT_TOP_K", "8"))
+SCOUT_CANDIDATES = int(os.getenv("SCOUT_CANDIDATES", "20"))  # results requested from search
+
+DEFAULT_WEIGHTS = {
+    "budget": 0.35,
+    "rating": 0.25,
+    "relevance": 0.25,
+    "repairability": 0.15,
+}
+
+# Bayesian rating prior: a product with few reviews is pulled towards this
+RATING_PRIOR = 3.5
+RATING_PRIOR_REVIEWS = 20
+
+# Query words that say nothing about the product itself
+STOPWORDS = frozenset({
+    "a", "an", "the", "for", "with", "and", "or", "of", "to", "in", "on", "my", "me", "i",
+    "need", "want", "looking", "best", "good", "great", "under", "below", "around", "about",
+    "cheap", "budget", "some", "something", "recommend", "please",
+})
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse "budget=0.4,rating=0.3"; unset or unknown keys keep their defaults"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            print(f"⚠️ Ignoring unknown ranking weight '{name}'")
+            continue
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid ranking weight '{part}'")
+    return weights
+
+SCOUT_RANK_WEIGHTS = parse_weights(os.getenv("SCOUT_RANK_WEIGHTS", ""))
+
+def query_terms(query: str) -> Set[str]:
+    return {t for t in tokenize(query) if len(t) > 1 and t not in STOPWORDS}
+
+def budget_fit(price: float, budget: float) -> float:
+    """1.0 at or under budget, falling linearly to 0 at 1.5x budget; unknown prices score 0"""
+    if price <= 0 or budget <= 0:
+        return 0.0
+    if price <= budget:
+        return 1.0
+    return max(0.0, 1.0 - (price - budget) / (budget * 0.5))
+
+def rating_score(rating: float, reviews: int) -> float:
+    """Review-weighted rating in [0, 1]"""
+    reviews = max(0, reviews or 0)
+    rating = rating or 0
+    return (rating * reviews + RATING_PRIOR * RATING_PRIOR_REVIEWS) / (reviews + RATING_PRIOR_REVIEWS) / 5
+
+def relevance(product: Product, terms: Set[str]) -> float:
+    """Fraction of query terms found in the product's name, tags and category"""
+    if not terms:
+        return 0.0
+    words = set(tokenize(product.name))
+    words.update(product.tags)
+    words.add(product.category)
+    return len(terms & words) / len(terms)
+
+def score_product(product: Product, terms: Set[str], budget: float, weights: Dict[str, float]) -> float:
+    return (
+        weights["budget"] * budget_fit(product.price, budget)
+        + weights["rating"] * rating_score(product.rating, product.reviews)
+        + weights["relevance"] * relevance(product, terms)
+        + weights["repairability"] * product.repairability_score / 10
+    )
+
+def top_k(
+    products: Iterable[Product],
+    query: str,
+    budget: float,
+    k: int = SCOUT_TOP_K,
+    weights: Dict[str, float] = SCOUT_RANK_WEIGHTS
+) -> List[Product]:
+    """
+    Best k products by score, highest first, in one pass with a size-k heap.
+
+    Duplicate ids keep their first occurrence; ties go to the earlier
+    (search-ranked) product.
+    """
+    if k <= 0:
+        return []
+    terms = query_terms(query)
+    heap: list = []
+    seen: Set[str] = set()
+    for index, p in enumerate(products):
+        if p.id in seen:
+            continue
+        seen.add(p.id)
+        # -index breaks ties towards earlier results and keeps Products out of comparisons
+        entry = (score_product(p, terms, budget, weights), -index, p)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    return [p for _, _, p in sorted(heap, reverse=True)]
@@ -0,0 +1,73 @@
+"""Vectorized Critic/Guardian heuristics over a batch of candidate products"""
+
+from typing import List, Dict, Tuple
+import numpy as np
+from app.services.records import Product, ProductAnalysis
+from app.services.title_classifier import (
+    classify_title, HIGH_HIDDEN_COST, MEDIUM_HIDDEN_COST, REFURBISHED, NEW_RELEASE
+)
+
+def name_flags(name: str) -> int:
+    """Bitmask of brand/keyword flags for one product name (memoized by the classifier)"""
+    return classify_title(name).flags
+
+def keyword_flags(names: List[str]) -> np.ndarray:
+    """Bitmask of brand/keyword flags for each product name"""
+    return np.fromiter((name_flags(name) for name in names), dtype=np.int64, count=len(names))
+
+def repairability_array(products: List[Product]) -> np.ndarray:
+    return np.fromiter((p.repairability_score for p in products), dtype=np.float64, count=len(products))
+
+def product_arrays(products: List[Product]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prices, repairability scores and keyword flags as parallel arrays"""
+    prices = np.fromiter((p.price for p in products), dtype=np.float64, count=len(products))
+    repairability = repairability_array(products)
+    flags = keyword_flags([p.name for p in products])
+    return prices, repairability, flags
+
+def critic_scores(prices: np.ndarray, repairability: np.ndarray, flags: np.ndarray, budget: float) -> Dict[str, np.ndarray]:
+    """value_score, hidden_cost_risk and deal_timing for every product"""
+    price_ratio = prices / (budget * 1.2)
+    base_score = np.maximum(0, 100 - (price_ratio * 80))  # cheaper is better base
+    repaired_score = base_score + (repairability * 2)
+    value_score = np.minimum(100, np.trunc(repaired_score)).astype(np.int64)
+
+    hidden_cost_risk = np.where(
+        flags & HIGH_HIDDEN_COST, "High",
+        np.where(flags & MEDIUM_HIDDEN_COST, "Medium", "Low")
+    )
+    deal_timing = np.where(
+        flags & REFURBISHED, "Great Price",
+        np.where(flags & NEW_RELEASE, "Wait (New Release)", "Buy Now")
+    )
+
+    return {
+        "value_score": value_score,
+        "hidden_cost_risk": hidden_cost_risk,
+        "deal_timing": deal_timing,
+    }
+
+def guardian_scores(repairability: np.ndarray) -> Dict[str, np.ndarray]:
+    """repairability_confidence and longevity_score for every product"""
+    confidence = np.where(
+        repairability >= 7, "High",
+        np.where(repairability >= 5, "Medium", "Low")
+    )
+    longevity = np.where(
+        repairability >= 8, "5+ Years (Upgradeable)",
+        np.where(repairability <= 3, "2-3 Years (Disposable)", "3-4 Years")
+    )
+
+    return {
+        "repairability_confidence": confidence,
+        "longevity_score": longevity,
+    }
+
+def to_analysis(products: List[Product], scores: Dict[str, np.ndarray]) -> Dict[str, ProductAnalysis]:
+    """Per-product analysis records with plain Python values (JSON-safe)"""
+    records = [ProductAnalysis() for _ in products]
+    # Fill column by column; cheaper than building a kwargs dict per product
+    for field, values in scores.items():
+        for record, value in zip(records, values.tolist()):
+            setattr(record, field, value)
+    return {p.id: record for p, record in zip(products, records)}
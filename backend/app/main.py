@@ -1,10 +1,21 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from app.agents.graph import graph
+from app.agents.graph import graph, run_batch
+from app.services.product_search import close_search_client
+from app.services.search_cache import search_cache
+from app.services.response_cache import response_cache, make_response_key
+from app.services.catalog import catalog
+from app.services.records import products_to_json
+from app.services.identity import compile_identity
+from app.services.metrics import IN_FLIGHT
+from app.services.tracing import span, shutdown_tracing
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from langchain_core.messages import HumanMessage
 import uvicorn
+import json
 import os
 
 from app.onboarding.chat_agent import process_chat_message, OnboardingChatRequest
@@ -34,24 +45,61 @@ class ChatResponse(BaseModel):
     products: List[Dict[str, Any]]
     final_response: str
 
+# Queries accepted by one /chat/batch request
+CHAT_BATCH_MAX_QUERIES = int(os.getenv("CHAT_BATCH_MAX_QUERIES", "8"))
+
+class BatchChatRequest(BaseModel):
+    queries: List[str]
+    identity: Dict[str, Any]
+
+class BatchQueryResult(BaseModel):
+    query: str
+    logs: List[Dict[str, Any]]
+    products: List[Dict[str, Any]]
+    final_response: str
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchQueryResult]
+    logs: List[Dict[str, Any]]  # steps shared by all queries
+    final_response: str
+
+@app.on_event("shutdown")
+async def shutdown_search_client():
+    await close_search_client()
+    shutdown_tracing()
+
 @app.get("/")
 def read_root():
     return {"message": "IdentityCart Backend API", "status": "running"}
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters for the search and /chat response caches"""
+    return {"search": search_cache.stats(), "response": response_cache.stats()}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.post("/onboarding/chat")
 async def onboarding_chat(request: OnboardingChatRequest):
     """Conversational onboarding to build user profile"""
-    try:
-        response = await process_chat_message(request)
-        return response.dict()
-    except Exception as e:
-        return {
-            "message": f"Sorry, I encountered an error: {str(e)}",
-            "complete": False
-        }
+    with IN_FLIGHT.labels("/onboarding/chat").track_inprogress(), \
+            span("POST /onboarding/chat", turns=len(request.conversation_history)) as s:
+        try:
+            response = await process_chat_message(request)
+            s.set(complete=response.complete)
+            return response.dict()
+        except Exception as e:
+            s.record_error(e)
+            return {
+                "message": f"Sorry, I encountered an error: {str(e)}",
+                "complete": False
+            }
 
-async def process_chat(request: ChatRequest) -> ChatResponse:
-    """Process chat request and run agent graph"""
+def missing_api_key_response() -> Optional[ChatResponse]:
+    """Response returned when no OpenRouter key is configured; None when one is"""
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key or api_key == "placeholder_key_not_set":
         return ChatResponse(
@@ -63,48 +111,174 @@ async def process_chat(request: ChatRequest) -> ChatResponse:
             products=[],
             final_response="## API Key Required\n\nSet OPENROUTER_API_KEY environment variable to use the AI agents.\n\nGet a key at https://openrouter.ai/"
         )
-    
-    initial_state = {
+    return None
+
+def build_initial_state(request: ChatRequest) -> Dict[str, Any]:
+    """Initial LangGraph state for a chat request"""
+    return {
         "messages": [HumanMessage(content=request.message)],
         "user_identity": request.identity,
+        "profile": compile_identity(request.identity),
         "products": [],
         "logs": []
     }
 
-    result = await graph.ainvoke(initial_state)
+async def process_chat(request: ChatRequest) -> ChatResponse:
+    """Process chat request and run agent graph"""
+    missing_key = missing_api_key_response()
+    if missing_key:
+        return missing_key
+
+    with span("process_chat", query=request.message) as s:
+        result = await graph.ainvoke(build_initial_state(request))
+        s.set(products=len(result.get("products", [])))
     
     return ChatResponse(
         logs=result.get("logs", []),
-        products=result.get("products", []),
+        products=products_to_json(result.get("products", [])),
         final_response=result.get("messages")[-1].content
     )
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint - triggers multi-agent product search"""
+    with IN_FLIGHT.labels("/chat").track_inprogress(), span("POST /chat", query=request.message):
+        try:
+            return await response_cache.get_or_compute(
+                make_response_key(request.message, request.identity),
+                lambda: process_chat(request),
+                # Don't pin empty results (missing key, upstream failure) in the cache
+                should_cache=lambda response: bool(response.products)
+            )
+        except Exception as e:
+            print(f"Chat error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Run the agent graph and yield SSE events as each stage completes.
+
+    Events:
+        log:     one agent log entry, emitted as its node finishes
+        products: the current product list (qualified by Scout, enriched by Mentor)
+        token:   a chunk of the Mentor's response text
+        done:    the full final response
+        error:   the pipeline failed
+    """
+    missing_key = missing_api_key_response()
+    if missing_key:
+        for log in missing_key.logs:
+            yield sse_event("log", log)
+        yield sse_event("products", missing_key.products)
+        yield sse_event("done", {"final_response": missing_key.final_response})
+        return
+
+    final_response = ""
     try:
-        return await process_chat(request)
+        async for mode, chunk in graph.astream(
+            build_initial_state(request),
+            stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "mentor" and message.content:
+                    final_response += message.content
+                    yield sse_event("token", {"content": message.content})
+                continue
+
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                for log in update.get("logs", []):
+                    yield sse_event("log", log)
+                if "products" in update:
+                    yield sse_event("products", products_to_json(update["products"]))
+                if node == "mentor" and update.get("messages"):
+                    # Covers the no-products path, which never calls the LLM
+                    final_response = update["messages"][-1].content
     except Exception as e:
-        print(f"Chat error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"Chat stream error: {e}")
+        yield sse_event("error", {"detail": str(e)})
+        return
+
+    yield sse_event("done", {"final_response": final_response})
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Streaming chat endpoint - emits agent logs, products and Mentor tokens over SSE"""
+    async def tracked_stream():
+        # In flight until the last event is sent, not just until headers go out
+        with IN_FLIGHT.labels("/chat/stream").track_inprogress(), \
+                span("POST /chat/stream", query=request.message):
+            async for event in stream_chat(request):
+                yield event
+
+    return StreamingResponse(
+        tracked_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(request: BatchChatRequest):
+    """Several queries for one identity: concurrent searches, one analysis pass, one Mentor call"""
+    queries = [q.strip() for q in request.queries if q and q.strip()]
+    if not queries:
+        raise HTTPException(status_code=400, detail="queries must contain at least one non-empty query")
+    if len(queries) > CHAT_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {CHAT_BATCH_MAX_QUERIES} queries per batch")
+
+    missing_key = missing_api_key_response()
+    if missing_key:
+        return BatchChatResponse(
+            results=[
+                BatchQueryResult(query=q, logs=[], products=[], final_response=missing_key.final_response)
+                for q in queries
+            ],
+            logs=missing_key.logs,
+            final_response=missing_key.final_response
+        )
+
+    with IN_FLIGHT.labels("/chat/batch").track_inprogress(), span("POST /chat/batch", queries=len(queries)) as s:
+        try:
+            result = await run_batch(queries, request.identity, compile_identity(request.identity))
+        except Exception as e:
+            print(f"Chat batch error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        s.set(products=sum(len(r["products"]) for r in result["results"]))
+
+    return BatchChatResponse(
+        results=[
+            BatchQueryResult(
+                query=r["query"],
+                logs=r["logs"],
+                products=products_to_json(r["products"]),
+                final_response=r["final_response"]
+            )
+            for r in result["results"]
+        ],
+        logs=result["logs"],
+        final_response=result["final_response"]
+    )
 
 @app.get("/products/{product_id}")
 async def get_product(product_id: str):
     """Get a single product by ID"""
     try:
-        import json
-        with open("data/products.json", "r") as f:
-            products = json.load(f)
-            
-        product = next((p for p in products if p["id"] == product_id), None)
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-            
-        return product
+        product = catalog.get(product_id)
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail="Products database not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    return product
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,8 +1,10 @@
 """Conversational onboarding agent for building user profiles"""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
+from app.onboarding.fast_extract import pre_extract
+from app.services.metrics import llm_config, record_onboarding_turn
 import os
 import json
 import re
@@ -12,13 +14,25 @@ api_key = os.getenv("OPENROUTER_API_KEY", "placeholder")
 llm = ChatOpenAI(
     model="openai/gpt-4o-mini",
     temperature=0.7,
-    base_url="https://openrouter.ai/api/v1",
-    api_key=api_key
+    base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    api_key=api_key,
+    stream_usage=True  # Token counts for /metrics
 )
 
+# "incremental" merges only the newest exchange into the previous partial_data;
+# "full" re-reads the whole transcript on every turn
+EXTRACTION_MODE = os.getenv("ONBOARDING_EXTRACTION_MODE", "incremental").lower()
+
+# "combined" extracts the profile and asks the next question in one LLM call;
+# "split" makes separate extraction and question calls
+TURN_MODE = os.getenv("ONBOARDING_TURN_MODE", "combined").lower()
+
+EXTRACTION_FIELDS = ["use_case", "interests", "values", "budget_preferred", "budget_maximum", "priorities"]
+
 class OnboardingChatRequest(BaseModel):
     conversation_history: List[Dict[str, str]]
     user_message: str
+    partial_data: Dict[str, Any] = None  # Echo of the previous turn's partial_data
 
 class OnboardingChatResponse(BaseModel):
     message: str
@@ -26,6 +40,18 @@ class OnboardingChatResponse(BaseModel):
     identity_profile: Dict[str, Any] = None
     partial_data: Dict[str, Any] = None  # What we've learned so far
 
+class OnboardingTurn(BaseModel):
+    """Structured output of a combined extraction + follow-up question call"""
+    use_case: str = ""
+    interests: List[str] = []
+    values: List[str] = []
+    budget_preferred: int = 0
+    budget_maximum: int = 0
+    priorities: List[str] = []
+    next_question: Optional[str] = None  # None once nothing important is missing
+
+turn_llm = llm.with_structured_output(OnboardingTurn)
+
 async def extract_identity_from_conversation(messages: List[Dict[str, str]]) -> Dict[str, Any]:
     """Extract structured identity profile from conversation history"""
     
@@ -60,7 +86,7 @@ Rules:
 """
     
     try:
-        response = llm.invoke(extraction_prompt)
+        response = await llm.ainvoke(extraction_prompt, config=llm_config("onboarding_extract"))
         content = response.content.strip()
         # Remove markdown code blocks if present
         content = content.replace("```json", "").replace("```", "").strip()
@@ -68,14 +94,80 @@ Rules:
         return extracted
     except Exception as e:
         print(f"Extraction error: {e}")
-        return {
-            "use_case": "general shopping",
-            "interests": [],
-            "values": [],
-            "budget_preferred": 0,
-            "budget_maximum": 0,
-            "priorities": []
-        }
+        return empty_extraction()
+
+def empty_extraction() -> Dict[str, Any]:
+    return {
+        "use_case": "general shopping",
+        "interests": [],
+        "values": [],
+        "budget_preferred": 0,
+        "budget_maximum": 0,
+        "priorities": []
+    }
+
+def merge_extraction(previous: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold newly extracted fields into the profile built on earlier turns"""
+    merged = empty_extraction()
+    merged.update({k: v for k, v in (previous or {}).items() if k in EXTRACTION_FIELDS})
+    
+    for field, value in (update or {}).items():
+        if field not in EXTRACTION_FIELDS:
+            continue
+        if isinstance(value, list):
+            existing = merged.get(field) or []
+            merged[field] = (existing + [v for v in value if v not in existing])[:5]
+        elif value in (None, "", 0, "general shopping"):
+            # Nothing new learned; keep what we had
+            continue
+        else:
+            merged[field] = value
+    
+    return merged
+
+async def extract_identity_incremental(
+    previous: Dict[str, Any],
+    last_question: str,
+    user_message: str
+) -> Dict[str, Any]:
+    """Update a partial profile from just the newest question/answer exchange"""
+    
+    extraction_prompt = f"""
+Update a shopper's identity profile using their latest answer.
+Use the Assistant's question to interpret the User's short answer (e.g. if Assistant asks "Budget?", User says "5000", then budget=5000).
+
+Profile so far:
+{json.dumps(previous)}
+
+Latest exchange:
+ASSISTANT: {last_question}
+USER: {user_message}
+
+Return ONLY valid JSON containing the fields this answer adds or changes, from:
+{{
+  "use_case": "what they're looking for (1 sentence)",
+  "interests": ["new", "interests"],
+  "values": ["sustainability", "performance", etc],
+  "budget_preferred": <number>,
+  "budget_maximum": <number>,
+  "priorities": ["what matters most to them"]
+}}
+
+Rules:
+- Extract budget numbers from any mention of price/budget (e.g. "1k" = 1000, "5000" = 5000)
+- Omit fields the answer says nothing about
+- Return {{}} if nothing new was learned
+- Return ONLY the JSON, no explanation
+"""
+    
+    try:
+        response = await llm.ainvoke(extraction_prompt, config=llm_config("onboarding_extract"))
+        content = response.content.strip()
+        content = content.replace("```json", "").replace("```", "").strip()
+        return merge_extraction(previous, json.loads(content))
+    except Exception as e:
+        print(f"Incremental extraction error: {e}")
+        return merge_extraction(previous, {})
 
 async def generate_next_question(messages: List[Dict[str, str]], extracted_data: Dict[str, Any]) -> str:
     """Generate contextual follow-up question based on what's missing"""
@@ -86,16 +178,9 @@ async def generate_next_question(messages: List[Dict[str, str]], extracted_data:
     ])
     
     
-    needs = []
-    if not extracted_data.get("use_case") or extracted_data["use_case"] == "general shopping":
-        needs.append("what they're looking for")
-    if not extracted_data.get("interests"):
-        needs.append("their interests/hobbies")
-    if not extracted_data.get("values"):
-        needs.append("what matters to them when shopping")
-    if not extracted_data.get("budget_preferred") or extracted_data["budget_preferred"] == 0:
-        needs.append("their budget")
+    needs = missing_fields(extracted_data)
     
+    if not needs:
         return None
     
     prompt = f"""
@@ -112,17 +197,93 @@ Return ONLY the question text, no explanation.
 """
     
     try:
-        response = llm.invoke(prompt)
+        response = await llm.ainvoke(prompt, config=llm_config("onboarding_question"))
         return response.content.strip()
-        # Fallback questions
-        if "what they're looking for" in needs:
-            return "What brings you here today? Are you looking for something specific?"
-        elif "their interests" in needs:
-            return "Tell me a bit about yourself - what do you do? What are your interests?"
-        elif "what matters to them" in needs:
-            return "When shopping, what matters most to you? (e.g., sustainability, performance, budget)"
-        else:
-            return "What's your budget range for this purchase?"
+    except Exception as e:
+        print(f"Question generation error: {e}")
+        return fallback_question(needs)
+
+def missing_fields(extracted_data: Dict[str, Any]) -> List[str]:
+    """What we still need to learn about the user"""
+    needs = []
+    if not extracted_data.get("use_case") or extracted_data["use_case"] == "general shopping":
+        needs.append("what they're looking for")
+    if not extracted_data.get("interests"):
+        needs.append("their interests/hobbies")
+    if not extracted_data.get("values"):
+        needs.append("what matters to them when shopping")
+    if not extracted_data.get("budget_preferred") or extracted_data["budget_preferred"] == 0:
+        needs.append("their budget")
+    return needs
+
+def fallback_question(needs: List[str]) -> Optional[str]:
+    """Canned follow-up question for the first missing field"""
+    if not needs:
+        return None
+    if "what they're looking for" in needs:
+        return "What brings you here today? Are you looking for something specific?"
+    elif "their interests/hobbies" in needs:
+        return "Tell me a bit about yourself - what do you do? What are your interests?"
+    elif "what matters to them when shopping" in needs:
+        return "When shopping, what matters most to you? (e.g., sustainability, performance, budget)"
+    else:
+        return "What's your budget range for this purchase?"
+
+async def extract_and_ask(
+    all_messages: List[Dict[str, str]],
+    previous: Optional[Dict[str, Any]]
+) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Extract the profile and write the next question in a single LLM call.
+
+    With a previous partial profile only the newest exchange is sent
+    (incremental mode); otherwise the whole transcript is. Returns None if
+    the call fails, so the caller can fall back to the two-call path.
+    """
+    
+    if previous:
+        last_question = next(
+            (m["content"] for m in reversed(all_messages[:-1]) if m["role"] == "assistant"),
+            ""
+        )
+        context = f"""Profile so far:
+{json.dumps(previous)}
+
+Latest exchange:
+ASSISTANT: {last_question}
+USER: {all_messages[-1]['content']}"""
+    else:
+        context = "Conversation:\n" + "\n".join([
+            f"{msg['role'].upper()}: {msg['content']}"
+            for msg in all_messages
+        ])
+    
+    prompt = f"""
+You are a friendly shopping assistant learning about a user.
+Use the Assistant's questions to interpret the User's short answers (e.g. if Assistant asks "Budget?", User says "5000", then budget=5000).
+
+{context}
+
+1. Fill in the user's profile: use_case (1 sentence), interests, values, budget_preferred, budget_maximum, priorities.
+   - Extract budget numbers from any mention of price/budget (e.g. "1k" = 1000, "5000" = 5000)
+   - Use 0 for unknown budgets and empty lists for unknown lists; keep lists to 3-5 items
+2. If use_case, interests, values or budget is still unknown, set next_question to a natural,
+   friendly question (1-2 sentences) about ONE of them. Otherwise set next_question to null.
+"""
+    
+    try:
+        turn = await turn_llm.ainvoke(prompt, config=llm_config("onboarding_turn"))
+    except Exception as e:
+        print(f"Combined onboarding turn error: {e}")
+        return None
+    if turn is None:
+        # Model answered without calling the structured-output tool
+        return None
+    
+    update = turn.dict()
+    next_question = update.pop("next_question")
+    extracted = merge_extraction(previous or empty_extraction(), update)
+    return extracted, (next_question.strip() if next_question else None)
 
 async def process_chat_message(request: OnboardingChatRequest) -> OnboardingChatResponse:
     """Process chat message and build identity profile"""
@@ -132,8 +293,40 @@ async def process_chat_message(request: OnboardingChatRequest) -> OnboardingChat
         {"role": "user", "content": request.user_message}
     ]
     
+    incremental = EXTRACTION_MODE == "incremental" and request.partial_data
+    last_question = next(
+        (m["content"] for m in reversed(request.conversation_history) if m["role"] == "assistant"),
+        ""
+    )
+    
+    # Rule-based fast path: budgets and plain use-case answers need no LLM.
+    # Only safe when earlier turns are already captured in partial_data.
+    fast_fields, resolved = pre_extract(request.user_message, last_question)
+    first_turn = not any(m["role"] == "user" for m in request.conversation_history)
+    skip_llm = resolved and (request.partial_data or first_turn)
+    record_onboarding_turn(bool(skip_llm), len(fast_fields))
+    
+    # One round-trip for extraction + next question when possible
+    combined = None
+    if skip_llm:
+        extracted = merge_extraction(request.partial_data or empty_extraction(), fast_fields)
+        combined = (extracted, fallback_question(missing_fields(extracted)))
+    elif TURN_MODE == "combined":
+        combined = await extract_and_ask(all_messages, request.partial_data if incremental else None)
+    
     # Extract what we know so far
-    extracted = await extract_identity_from_conversation(all_messages)
+    if combined:
+        extracted, next_question = combined
+    elif incremental:
+        extracted = await extract_identity_incremental(
+            request.partial_data, last_question, request.user_message
+        )
+    else:
+        extracted = await extract_identity_from_conversation(all_messages)
+    
+    if not skip_llm:
+        # Locally parsed fields fill any gaps the LLM left
+        extracted = merge_extraction(fast_fields, extracted)
     
     # Check if we have enough information
     has_use_case = extracted.get("use_case") and extracted["use_case"] != "general shopping"
@@ -148,7 +341,9 @@ async def process_chat_message(request: OnboardingChatRequest) -> OnboardingChat
     if has_use_case and has_real_budget and user_message_count >= 2:
         should_complete = True
         next_question = None
-        next_question = await generate_next_question(all_messages, extracted)
+    else:
+        if not combined:
+            next_question = await generate_next_question(all_messages, extracted)
         # Also complete if conversation is getting long
         if has_use_case and has_real_budget and user_message_count >= 4:
             should_complete = True
@@ -0,0 +1,168 @@
+"""Rule-based fast path for trivially parseable onboarding answers"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.title_classifier import CATEGORY_KEYWORDS
+
+# Units that make a number a spec, not money ("16GB", "144 Hz", '15.6"')
+_UNITS = r"(?:gb|tb|mb|ghz|mhz|hz|mp|mah|fps|inch(?:es)?|cm|mm)\b|[\"”″]"
+_CURRENCY_WORDS = r"dollars|dollar|usd|bucks|eur|euros|gbp|pounds"
+
+def _amount(n: int) -> str:
+    """One amount with currency symbol, k/m suffix and currency word captured as cur/suf/word{n}"""
+    return (
+        rf"(?P<cur{n}>[$€£]\s*)?"
+        # Whole numbers only: not the tail of "16GB" or "15.6"
+        rf"(?<![\w.])(?P<num{n}>\d+(?:,\d{{3}})*(?:\.\d+)?)(?![\d,.]?\d)"
+        rf"(?!\s*(?:{_UNITS}))"
+        rf"(?:\s*(?P<suf{n}>[km])(?![a-z]))?(?![a-z])"
+        rf"(?P<word{n}>\s*(?:{_CURRENCY_WORDS})\b)?"
+    )
+
+# A range ("$800-1200", "1 to 2k") or a single amount, leftmost first
+_BUDGET_RE = re.compile(
+    rf"{_amount(1)}\s*(?:-|–|to|and)\s*{_amount(2)}|{_amount(0)}",
+    re.IGNORECASE
+)
+_CAP_WORDS = r"under|below|less than|max|maximum|up to|no more than|not more than|at most"
+_CAP_RE = re.compile(rf"\b(?:{_CAP_WORDS})\b", re.IGNORECASE)
+# Qualifier words around an amount, removed with it ("under $800", "$800 max")
+_LEADING_QUALIFIER_RE = re.compile(
+    rf"\b(?:{_CAP_WORDS}|around|about|roughly|approximately|between)\s*$", re.IGNORECASE
+)
+_TRAILING_QUALIFIER_RE = re.compile(r"^\s*(?:max|maximum|tops|or less)\b", re.IGNORECASE)
+_BUDGET_WORD_RE = re.compile(r"\b(?:budget|spend)\b", re.IGNORECASE)
+_BUDGET_QUESTION_RE = re.compile(r"budget|spend|price|cost|how much", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Words that carry no profile information in a short answer
+FILLER_WORDS = {
+    "a", "an", "the", "i", "i'm", "im", "my", "me", "is", "it", "its", "of", "for", "to", "and",
+    "or", "some", "something", "like", "maybe", "probably", "around", "about", "roughly",
+    "approximately", "approx", "ish", "just", "need", "want", "looking", "new", "get", "buy",
+    "budget", "can", "spend", "under", "below", "less", "than", "max", "maximum", "up", "no",
+    "more", "at", "most", "between", "dollars", "dollar", "usd", "bucks", "eur", "euros",
+    "gbp", "pounds", "k", "m", "total", "good", "please", "would", "be", "great", "ok", "okay",
+}
+
+# Words that only joined the budget to the rest of the answer
+LEADING_CONNECTORS = {"", "for", "and", "with", "on"}
+
+# Answers mentioning these still need the LLM to pick up values/priorities
+VALUE_HINT_WORDS = {
+    "sustainable", "sustainability", "eco", "repair", "repairable", "repairability",
+    "performance", "quality", "durable", "durability", "ethical", "privacy", "upgrade",
+    "upgradeable", "cheap", "value", "brand", "design", "battery", "portable", "quiet",
+}
+
+# Keyword (word-boundary match) -> category, from the shared product lexicon
+_CATEGORY_RES: List[Tuple[str, re.Pattern]] = [
+    (category, re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")s?\b", re.IGNORECASE))
+    for category, keywords in CATEGORY_KEYWORDS
+]
+_CATEGORY_RES_BY_NAME = dict(_CATEGORY_RES)
+
+def parse_amount(number: str, suffix: Optional[str]) -> int:
+    value = float(number.replace(",", ""))
+    if suffix:
+        value *= 1_000 if suffix.lower() == "k" else 1_000_000
+    return int(round(value))
+
+def _is_marked(match: re.Match) -> bool:
+    """Whether a budget expression carries a currency symbol, k/m suffix or currency word"""
+    return any(
+        match.group(f"{kind}{n}")
+        for n in (0, 1, 2) for kind in ("cur", "suf", "word")
+    )
+
+def _budget_fields(match: re.Match) -> Dict[str, int]:
+    if match.group("num0") is not None:
+        amount = parse_amount(match.group("num0"), match.group("suf0"))
+        return {"budget_preferred": amount} if amount > 0 else {}
+    low = parse_amount(match.group("num1"), match.group("suf1"))
+    # "1-2k": a suffix on the upper bound applies to both
+    high = parse_amount(match.group("num2"), match.group("suf2"))
+    if match.group("suf2") and not match.group("suf1"):
+        low = parse_amount(match.group("num1"), match.group("suf2"))
+    low, high = min(low, high), max(low, high)
+    return {"budget_preferred": low, "budget_maximum": high} if high > 0 else {}
+
+def parse_budget(message: str, last_question: str = "") -> Tuple[Dict[str, int], str]:
+    """
+    Pull budget_preferred/budget_maximum out of a message.
+
+    Amounts marked as money ("$800", "1.2k", "900 dollars") are preferred.
+    A bare number only counts when the message talks about budget or the
+    assistant just asked about it, and nothing else is said ("around
+    1200"), so "16GB" or "I have 2 kids" aren't mistaken for budgets. More
+    than one candidate amount is left to the LLM. Returns the fields and
+    the message with the budget expression (and any "under"/"max" around
+    it) removed.
+    """
+    expressions = list(_BUDGET_RE.finditer(message))
+    candidates = [m for m in expressions if _is_marked(m)]
+    bare = not candidates
+    if bare:
+        if not (_BUDGET_WORD_RE.search(message) or _BUDGET_QUESTION_RE.search(last_question)):
+            return {}, message
+        candidates = expressions
+    if len(candidates) != 1:
+        return {}, message
+
+    match = candidates[0]
+    before, after = message[:match.start()], message[match.end():]
+    leading = _LEADING_QUALIFIER_RE.search(before)
+    trailing = _TRAILING_QUALIFIER_RE.match(after)
+    rest = (before[:leading.start()] if leading else before) + " " + (after[trailing.end():] if trailing else after)
+    if bare and any(w not in FILLER_WORDS for w in _WORD_RE.findall(rest.lower())):
+        return {}, message
+
+    fields = _budget_fields(match)
+    if not fields:
+        return {}, message
+    # "under $800" is a hard cap; "around $800" only a target
+    if "budget_maximum" not in fields and _CAP_RE.search(message):
+        fields["budget_maximum"] = fields["budget_preferred"]
+    return fields, rest
+
+def detect_category(message: str) -> Optional[str]:
+    for category, pattern in _CATEGORY_RES:
+        if pattern.search(message):
+            return category
+    return None
+
+def pre_extract(message: str, last_question: str = "") -> Tuple[Dict[str, Any], bool]:
+    """
+    Resolve what we can from a user answer without an LLM.
+
+    Returns the extracted fields and whether the whole answer was
+    accounted for (i.e. the LLM would learn nothing more from it).
+    """
+    fields, rest = parse_budget(message, last_question)
+    # An amount parse_budget would not vouch for ("a laptop under 800") is
+    # still probably a budget; let the LLM read it rather than drop it
+    unparsed_amount = "budget_preferred" not in fields and _BUDGET_RE.search(rest)
+
+    category = detect_category(rest)
+    words = _WORD_RE.findall(rest.lower())
+    if category:
+        use_case = rest.split()
+        while use_case and use_case[-1].lower().strip(".!,") in FILLER_WORDS:
+            use_case.pop()
+        # What was left after the budget, e.g. "[under $800] for a laptop"
+        while use_case and use_case[0].lower().strip(".!,") in LEADING_CONNECTORS:
+            use_case.pop(0)
+        fields["use_case"] = " ".join(use_case).rstrip(".!,") or message.strip()
+
+    leftover = [w for w in words if w not in FILLER_WORDS and not w.isdigit()]
+    if category:
+        leftover = [w for w in leftover if not _CATEGORY_RES_BY_NAME[category].fullmatch(w)]
+
+    if not fields or unparsed_amount or any(w in VALUE_HINT_WORDS for w in words):
+        return fields, False
+
+    # Pure budget answers must be fully consumed; use-case answers may keep a
+    # couple of descriptive words ("a laptop for coding")
+    resolved = len(leftover) == 0 or (category is not None and len(leftover) <= 3)
+    return fields, resolved
@@ -0,0 +1,78 @@
+"""Indexed, hot-reloadable view of the static product catalog"""
+
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, NamedTuple
+
+CATALOG_PATH = os.getenv("CATALOG_PATH", "data/products.json")
+
+class CatalogIndex(NamedTuple):
+    """Immutable snapshot of the catalog; swapped as a whole on reload"""
+    mtime: float
+    products: List[Dict[str, Any]]
+    by_id: Dict[str, Dict[str, Any]]
+    by_category: Dict[str, List[Dict[str, Any]]]
+    by_tag: Dict[str, List[Dict[str, Any]]]
+
+class ProductCatalog:
+    """
+    Loads products.json once and serves O(1) lookups by id, category and tag.
+
+    The file's mtime is checked on access; when it changes the indexes are
+    rebuilt off to the side and published with a single reference swap, so
+    readers always see either the old or the new catalog, never a mix.
+    Returned dicts are shared between callers - copy before mutating.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self._index: Optional[CatalogIndex] = None
+        self._reload_lock = threading.Lock()
+
+    def snapshot(self) -> CatalogIndex:
+        """Current immutable index; changes identity whenever the file reloads"""
+        return self._current()
+
+    def _current(self) -> CatalogIndex:
+        mtime = os.stat(self.path).st_mtime
+        index = self._index
+        if index is not None and index.mtime == mtime:
+            return index
+
+        with self._reload_lock:
+            # Another caller may have reloaded while we waited
+            index = self._index
+            if index is None or index.mtime != mtime:
+                index = self._build_index(mtime)
+                self._index = index
+        return index
+
+    def _build_index(self, mtime: float) -> CatalogIndex:
+        with open(self.path, "r") as f:
+            products = json.load(f)
+
+        by_id = {}
+        by_category = {}
+        by_tag = {}
+        for p in products:
+            by_id[p["id"]] = p
+            by_category.setdefault(p.get("category", "").lower(), []).append(p)
+            for tag in p.get("tags", []):
+                by_tag.setdefault(tag.lower(), []).append(p)
+
+        return CatalogIndex(mtime, products, by_id, by_category, by_tag)
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self._current().by_id.get(product_id)
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        return self._current().by_category.get(category.lower(), [])
+
+    def by_tag(self, tag: str) -> List[Dict[str, Any]]:
+        return self._current().by_tag.get(tag.lower(), [])
+
+    def all(self) -> List[Dict[str, Any]]:
+        return self._current().products
+
+catalog = ProductCatalog()
@@ -0,0 +1,113 @@
+"""
+Compiled identity profiles.
+
+The onboarding identity_profile is loosely shaped (budget may be a number
+or a preferred/maximum dict, values are free-form strings). compile_identity
+normalizes it once at the API boundary into an immutable view every graph
+node shares, memoized by a canonical hash so repeat users skip the work.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Union
+
+# Only these identity fields change what the agent graph returns
+RESULT_IDENTITY_FIELDS = ("budget", "values", "role")
+
+# Fallbacks when the profile has no usable budget: Scout searches wide,
+# the Critic scores value against a mid-range budget
+SEARCH_BUDGET_DEFAULT = 10000
+VALUE_BUDGET_DEFAULT = 1000
+
+COMPILED_IDENTITY_CACHE_SIZE = 1024
+
+# Free-form value strings that map to each flag (matched as substrings)
+REPAIRABILITY_WORDS = ("repair", "upgrad", "modular")
+# Not bare "eco", which would also match "economical"
+ECO_WORDS = ("eco-", "eco ", "ecolog", "sustainab", "environment", "green", "recycl")
+
+# Roles that read technical spec sheets comfortably
+TECHNICAL_ROLE_WORDS = ("dev", "eng")
+
+class CompiledIdentity(NamedTuple):
+    profile_hash: str
+    role: str                       # as given, for prompts
+    technical_role: bool
+    budget: Optional[int]           # maximum, else preferred; None if unset
+    search_budget: int
+    value_budget: int
+    values: FrozenSet[str]          # lowercased
+    values_repairability: bool
+    values_eco: bool
+
+def identity_hash(identity: Dict[str, Any]) -> str:
+    """Canonical hash of the identity fields that affect the result"""
+    relevant = {}
+    for field in RESULT_IDENTITY_FIELDS:
+        value = identity.get(field)
+        if field == "values" and isinstance(value, list):
+            value = sorted(str(v) for v in value)
+        relevant[field] = value
+    canonical = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def resolve_budget(raw_budget: Any) -> Optional[int]:
+    """Budget cap from a number or a {"preferred", "maximum"} dict; None if unusable"""
+    try:
+        if isinstance(raw_budget, dict):
+            # Use maximum if it exists and is > 0, otherwise preferred
+            for key in ("maximum", "preferred"):
+                value = raw_budget.get(key)
+                if value and float(value) > 0:
+                    return int(value)
+            return None
+        return int(raw_budget) if raw_budget and float(raw_budget) > 0 else None
+    except (ValueError, TypeError):
+        return None
+
+def _mentions(values: FrozenSet[str], words) -> bool:
+    return any(word in value for value in values for word in words)
+
+def _compile(identity: Dict[str, Any], profile_hash: str) -> CompiledIdentity:
+    role = str(identity.get("role") or "User")
+    raw_values = identity.get("values") or []
+    if isinstance(raw_values, str):
+        raw_values = [raw_values]
+    values = frozenset(str(v).strip().lower() for v in raw_values if v)
+    budget = resolve_budget(identity.get("budget"))
+
+    return CompiledIdentity(
+        profile_hash=profile_hash,
+        role=role,
+        technical_role=any(word in role.lower() for word in TECHNICAL_ROLE_WORDS),
+        budget=budget,
+        search_budget=budget or SEARCH_BUDGET_DEFAULT,
+        value_budget=budget or VALUE_BUDGET_DEFAULT,
+        values=values,
+        values_repairability=_mentions(values, REPAIRABILITY_WORDS),
+        values_eco="eco" in values or _mentions(values, ECO_WORDS),
+    )
+
+_compiled: "OrderedDict[str, CompiledIdentity]" = OrderedDict()
+_compiled_lock = threading.Lock()
+
+def compile_identity(identity: Union[Dict[str, Any], CompiledIdentity, None]) -> CompiledIdentity:
+    """Compiled view of an identity profile, shared by all requests with the same profile"""
+    if isinstance(identity, CompiledIdentity):
+        return identity
+    identity = identity or {}
+    profile_hash = identity_hash(identity)
+    with _compiled_lock:
+        compiled = _compiled.get(profile_hash)
+        if compiled is not None:
+            _compiled.move_to_end(profile_hash)
+            return compiled
+
+    compiled = _compile(identity, profile_hash)
+    with _compiled_lock:
+        _compiled[profile_hash] = compiled
+        while len(_compiled) > COMPILED_IDENTITY_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
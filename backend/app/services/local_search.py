@@ -0,0 +1,114 @@
+"""In-process BM25 full-text search over the static product catalog"""
+
+import heapq
+import math
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.services.catalog import catalog, CatalogIndex
+from app.services.records import Product
+from app.services.spec_parser import parse_spec_values
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def product_text(product: Dict[str, Any]) -> str:
+    """Searchable text for a catalog product: name, tags, category and specs"""
+    specs = product.get("specs", {})
+    spec_text = " ".join(f"{k} {v}" for k, v in specs.items()) if isinstance(specs, dict) else ""
+    return " ".join([
+        product.get("name", ""),
+        " ".join(product.get("tags", [])),
+        product.get("category", ""),
+        spec_text
+    ])
+
+def to_search_result(product: Dict[str, Any]) -> Product:
+    """Catalog product as the same normalized record as SerpAPI results"""
+    return Product(
+        id=product["id"],
+        name=product.get("name", "Unknown Product"),
+        price=float(product.get("price", 0)),
+        image_url=product.get("image_url", ""),
+        link=product.get("link", f"/product/{product['id']}"),
+        source="IdentityCart Catalog",
+        rating=product.get("rating", 0),
+        reviews=product.get("reviews", 0),
+        category=product.get("category", "electronics"),
+        specs=dict(product.get("specs", {})),
+        spec_values=parse_spec_values(product.get("specs", {}), product.get("name", "")),
+        repairability_score=product.get("repairability_score", 5),
+        tags=product.get("tags", ())
+    )
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of products"""
+
+    def __init__(self, products: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.products = products
+        self.k1 = k1
+        self.b = b
+
+        # term -> [(doc index, term frequency)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+        for i, product in enumerate(products):
+            tokens = tokenize(product_text(product))
+            self.doc_lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((i, tf))
+
+        n_docs = len(products)
+        self.avg_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query: str, max_results: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for i, tf in docs:
+                norm = 1 - self.b + self.b * self.doc_lengths[i] / self.avg_length
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        top = heapq.nlargest(max_results, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, self.products[i]) for i, score in top]
+
+_index: Optional[BM25Index] = None
+_indexed_snapshot: Optional[CatalogIndex] = None
+_index_lock = threading.Lock()
+
+def get_index() -> BM25Index:
+    """BM25 index for the current catalog, rebuilt when the catalog reloads"""
+    global _index, _indexed_snapshot
+    snapshot = catalog.snapshot()
+    if _index is None or _indexed_snapshot is not snapshot:
+        with _index_lock:
+            if _index is None or _indexed_snapshot is not snapshot:
+                _index = BM25Index(snapshot.products)
+                _indexed_snapshot = snapshot
+    return _index
+
+def search_catalog(query: str, max_results: int = 10) -> List[Product]:
+    """
+    Search the static catalog without any network calls.
+
+    Args:
+        query: Search query (e.g., "gaming gpu 1440p")
+        max_results: Maximum number of results to return
+
+    Returns:
+        List of Product records with the same structure as search_products
+    """
+    return [to_search_result(p) for _, p in get_index().search(query, max_results)]
@@ -0,0 +1,164 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Covers per-node graph latency, SerpAPI latency by status, LLM latency and
+token usage by caller, in-flight requests per endpoint, onboarding turns
+that skipped the LLM and the search and response cache counters.
+"""
+
+import functools
+import inspect
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import ensure_config, merge_configs
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.services.search_cache import search_cache
+from app.services.response_cache import response_cache
+from app.services.tracing import span, token_usage, LLMSpanCallback
+
+# Upstream calls range from tens of ms (cache, catalog) to tens of seconds (LLM)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+
+NODE_DURATION = Histogram(
+    "identitycart_node_duration_seconds",
+    "Time spent in each LangGraph node",
+    ["node"],
+    buckets=LATENCY_BUCKETS
+)
+SERPAPI_LATENCY = Histogram(
+    "identitycart_serpapi_request_duration_seconds",
+    "SerpAPI request latency, by HTTP status (or 'error' when no response)",
+    ["status"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_LATENCY = Histogram(
+    "identitycart_llm_request_duration_seconds",
+    "LLM call latency, by caller and outcome",
+    ["caller", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "identitycart_llm_tokens_total",
+    "LLM tokens used, by caller and kind (prompt/completion)",
+    ["caller", "kind"]
+)
+ONBOARDING_TURNS = Counter(
+    "identitycart_onboarding_turns_total",
+    "Onboarding turns, by path ('fast' when the rule-based extractor skipped the LLM, else 'llm')",
+    ["path"]
+)
+ONBOARDING_FAST_FIELDS = Counter(
+    "identitycart_onboarding_fast_fields_total",
+    "Profile fields resolved by the rule-based onboarding extractor"
+)
+IN_FLIGHT = Gauge(
+    "identitycart_requests_in_flight",
+    "Requests currently being processed, by endpoint",
+    ["endpoint"]
+)
+
+def observe_node(name: str):
+    """Wrap a graph node so each run is recorded in NODE_DURATION and traced as a span"""
+    histogram = NODE_DURATION.labels(name)
+
+    def describe(s, result):
+        if isinstance(result, dict) and "products" in result:
+            s.set(products=len(result["products"]))
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_node(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    with span(f"node.{name}") as s:
+                        result = await fn(*args, **kwargs)
+                        describe(s, result)
+                        return result
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return async_node
+
+        @functools.wraps(fn)
+        def node(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with span(f"node.{name}") as s:
+                    result = fn(*args, **kwargs)
+                    describe(s, result)
+                    return result
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return node
+
+    return decorator
+
+def record_onboarding_turn(llm_skipped: bool, fields_resolved: int):
+    ONBOARDING_TURNS.labels("fast" if llm_skipped else "llm").inc()
+    ONBOARDING_FAST_FIELDS.inc(fields_resolved)
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records latency and token usage of every LLM call it is attached to"""
+
+    # Run on the event loop rather than a worker thread so timings stay exact
+    run_inline = True
+
+    def __init__(self, caller: str):
+        self.caller = caller
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "success")
+        prompt_tokens, completion_tokens = token_usage(response)
+        if prompt_tokens:
+            LLM_TOKENS.labels(self.caller, "prompt").inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(self.caller, "completion").inc(completion_tokens)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._finish(run_id, "error")
+
+    def _finish(self, run_id: UUID, outcome: str):
+        start = self._started.pop(run_id, None)
+        if start is not None:
+            LLM_LATENCY.labels(self.caller, outcome).observe(time.perf_counter() - start)
+
+_llm_callbacks: Dict[str, list] = {}
+
+def llm_config(caller: str) -> Dict[str, Any]:
+    """Runnable config attaching LLM metrics and trace spans for `caller` (mentor, onboarding_extract, ...)"""
+    if caller not in _llm_callbacks:
+        _llm_callbacks[caller] = [LLMMetricsCallback(caller), LLMSpanCallback(caller)]
+    # Merge with the inherited config; a bare callbacks list would replace the
+    # graph's own handlers and break token streaming
+    return merge_configs(ensure_config(), {"callbacks": list(_llm_callbacks[caller])})
+
+class CacheCollector:
+    """Exports the search and response cache counters at scrape time"""
+
+    def collect(self):
+        hits = CounterMetricFamily("identitycart_cache_hits", "Cache hits (including stale hits)", labels=["cache"])
+        misses = CounterMetricFamily("identitycart_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("identitycart_cache_hit_ratio", "Cache hits / lookups since start", labels=["cache"])
+        size = GaugeMetricFamily("identitycart_cache_entries", "Entries currently cached", labels=["cache"])
+
+        for name, stats in (("search", search_cache.stats()), ("response", response_cache.stats())):
+            hits.add_metric([name], stats["hits"] + stats.get("stale_hits", 0))
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats["hit_ratio"])
+            size.add_metric([name], stats["size"])
+
+        yield from (hits, misses, ratio, size)
+
+REGISTRY.register(CacheCollector())
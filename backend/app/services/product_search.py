@@ -1,19 +1,201 @@
 """Real-time product search using SerpAPI"""
 
 import os
+import time
+import asyncio
+import httpx
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib.parse import quote_plus
+from app.services.search_cache import search_cache, make_cache_key
+from app.services.metrics import SERPAPI_LATENCY
+from app.services.tracing import span, annotate
+from app.services.local_search import search_catalog
+from app.services.records import Product
+from app.services.spec_parser import (
+    parse_spec_values, STORAGE_TITLE_RE, MEMORY_TITLE_RE, DISPLAY_TITLE_RE, CPU_TITLE_RE
+)
+from app.services.title_classifier import classify_title
 
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY", "")
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
+SERPAPI_GL = os.getenv("SERPAPI_GL", "us")  # Country: United States
 
-def search_products(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+# "serpapi", "catalog", or "auto" (SerpAPI when a key is configured, else catalog)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+
+# Async client tuning
+SERPAPI_CONNECT_TIMEOUT = float(os.getenv("SERPAPI_CONNECT_TIMEOUT", "5"))
+SERPAPI_READ_TIMEOUT = float(os.getenv("SERPAPI_READ_TIMEOUT", "20"))
+SERPAPI_MAX_CONCURRENCY = int(os.getenv("SERPAPI_MAX_CONCURRENCY", "10"))
+SERPAPI_MAX_KEEPALIVE = int(os.getenv("SERPAPI_MAX_KEEPALIVE", "10"))
+
+# Shared across requests; created lazily inside the running event loop
+_async_client: Optional[httpx.AsyncClient] = None
+_request_semaphore: Optional[asyncio.Semaphore] = None
+
+# Upstream searches currently in progress, keyed like the result cache
+_inflight_searches: Dict[str, asyncio.Future] = {}
+
+def build_search_params(query: str, max_results: int, gl: str = SERPAPI_GL) -> Dict[str, Any]:
+    """SerpAPI Google Shopping query parameters"""
+    return {
+        "engine": "google_shopping",
+        "q": query,
+        "api_key": SERPAPI_KEY,
+        "num": max_results,
+        "gl": gl
+    }
+
+def parse_search_results(data: Dict[str, Any], max_results: int) -> List[Product]:
+    """Parse a SerpAPI response into our normalized product structure"""
+    products = []
+    for item in data.get("shopping_results", [])[:max_results]:
+        profile = classify_title(item.get("title", ""))
+        specs = extract_specs(item)
+        product = Product(
+            id=f"serp-{item.get('position', 0)}",
+            name=item.get("title", "Unknown Product"),
+            price=parse_price(item.get("price", "$0")),
+            image_url=item.get("thumbnail", ""),
+            link=item.get("link") or f"https://www.google.com/search?tbm=shop&q={quote_plus(item.get('title', ''))}",
+            source=item.get("source", "Google Shopping"),
+            rating=item.get("rating", 0),
+            reviews=item.get("reviews", 0),
+            category=profile.category,
+            specs=specs,
+            spec_values=parse_spec_values(specs, item.get("title", "")),
+            repairability_score=profile.repairability,
+            tags=profile.tags
+        )
+        products.append(product)
+    return products
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client, creating it on first use"""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                SERPAPI_READ_TIMEOUT,
+                connect=SERPAPI_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=SERPAPI_MAX_CONCURRENCY,
+                max_keepalive_connections=SERPAPI_MAX_KEEPALIVE
+            )
+        )
+    return _async_client
+
+def get_request_semaphore() -> asyncio.Semaphore:
+    """Cap on in-flight SerpAPI requests across all callers"""
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(SERPAPI_MAX_CONCURRENCY)
+    return _request_semaphore
+
+async def close_search_client():
+    """Close the shared client (called on app shutdown)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+class SearchAbandoned(Exception):
+    """The request leading a shared search was cancelled before it finished"""
+
+async def search_products_async(query: str, max_results: int = 10, gl: str = SERPAPI_GL) -> List[Product]:
+    """
+    Non-blocking variant of search_products.
+
+    Uses a shared keep-alive connection pool and caps concurrent upstream
+    requests, so concurrent /chat requests overlap their waits instead of
+    stalling the event loop. Concurrent calls for the same normalized query
+    share a single upstream request.
+    """
+
+    if not SERPAPI_KEY:
+        raise Exception("SERPAPI_API_KEY not configured. Real-time search unavailable.")
+
+    cache_key = make_cache_key(query, max_results, gl)
+    cached = await search_cache.aget(cache_key)
+    if cached is not None:
+        annotate(source="cache")
+        return cached
+
+    # Single-flight: join an identical search that is already in progress
+    inflight = _inflight_searches.get(cache_key)
+    if inflight is not None:
+        annotate(source="shared")
+        try:
+            products = await asyncio.shield(inflight)
+        except SearchAbandoned:
+            # The leader was cancelled, not us; search again (possibly as the new leader)
+            return await search_products_async(query, max_results, gl)
+        return [p.copy() for p in products]
+
+    annotate(source="serpapi")
+    inflight = asyncio.get_running_loop().create_future()
+    # Mark the exception retrieved even when nobody else was waiting
+    inflight.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight_searches[cache_key] = inflight
+
+    try:
+        async with get_request_semaphore():
+            start = time.perf_counter()
+            status = "error"
+            try:
+                with span("serpapi.request", query=query) as s:
+                    response = await get_async_client().get(
+                        SERPAPI_URL,
+                        params=build_search_params(query, max_results, gl)
+                    )
+                    status = str(response.status_code)
+                    s.set(status=response.status_code)
+            finally:
+                SERPAPI_LATENCY.labels(status).observe(time.perf_counter() - start)
+        response.raise_for_status()
+        products = parse_search_results(response.json(), max_results)
+        search_cache.set(cache_key, products)
+        inflight.set_result(products)
+        return [p.copy() for p in products]
+
+    except asyncio.CancelledError:
+        # Only the leader was cancelled; followers get a retryable error instead
+        inflight.set_exception(SearchAbandoned(query))
+        raise
+    except Exception as e:
+        print(f"SerpAPI error: {e}")
+        inflight.set_exception(e)
+        raise
+    finally:
+        # Failures are not remembered; the next caller retries upstream
+        _inflight_searches.pop(cache_key, None)
+
+def active_search_backend() -> str:
+    if SEARCH_BACKEND in ("serpapi", "catalog"):
+        return SEARCH_BACKEND
+    return "serpapi" if SERPAPI_KEY else "catalog"
+
+async def find_products(query: str, max_results: int = 10) -> List[Product]:
+    """Search with the configured backend (SerpAPI or the local catalog index)"""
+    backend = active_search_backend()
+    with span("search_products", query=query, backend=backend, max_results=max_results) as s:
+        if backend == "catalog":
+            products = search_catalog(query, max_results)
+        else:
+            products = await search_products_async(query, max_results)
+        s.set(products=len(products))
+        return products
+
+def search_products(query: str, max_results: int = 10, gl: str = SERPAPI_GL) -> List[Product]:
     """
     Search for products using SerpAPI Google Shopping
     
     Args:
         query: Search query (e.g., "macbook pro m3")
         max_results: Maximum number of results to return
+        gl: Google country code for the search locale
         
     Returns:
         List of product dictionaries with normalized structure
@@ -22,39 +204,27 @@ def search_products(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
     if not SERPAPI_KEY:
         raise Exception("SERPAPI_API_KEY not configured. Real-time search unavailable.")
     
+    cache_key = make_cache_key(query, max_results, gl)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        url = "https://serpapi.com/search"
-        params = {
-            "engine": "google_shopping",
-            "q": query,
-            "api_key": SERPAPI_KEY,
-            "num": max_results,
-            "gl": "us"  # Country: United States
-        }
+        params = build_search_params(query, max_results, gl)
         
-        response = requests.get(url, params=params, timeout=20)  # Increased timeout
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with span("serpapi.request", query=query) as s:
+                response = requests.get(SERPAPI_URL, params=params, timeout=20)  # Increased timeout
+                status = str(response.status_code)
+                s.set(status=response.status_code)
+        finally:
+            SERPAPI_LATENCY.labels(status).observe(time.perf_counter() - start)
         response.raise_for_status()
-        data = response.json()
-        
-        # Parse SerpAPI results into our format
-        products = []
-        for item in data.get("shopping_results", [])[:max_results]:
-            product = {
-                "id": f"serp-{item.get('position', 0)}",
-                "name": item.get("title", "Unknown Product"),
-                "price": parse_price(item.get("price", "$0")),
-                "image_url": item.get("thumbnail", ""),
-                "link": item.get("link") or f"https://www.google.com/search?tbm=shop&q={quote_plus(item.get('title', ''))}",
-                "source": item.get("source", "Google Shopping"),
-                "rating": item.get("rating", 0),
-                "reviews": item.get("reviews", 0),
-                "category": categorize_product(item.get("title", "")),
-                "specs": extract_specs(item),
-                "repairability_score": calculate_repairability(item.get("title", "")),
-                "tags": generate_tags(item.get("title", ""))
-            }
-            products.append(product)
         
+        products = parse_search_results(response.json(), max_results)
+        search_cache.set(cache_key, products)
         return products
         
     except Exception as e:
@@ -70,33 +240,6 @@ def parse_price(price_str: str) -> float:
     except:
         return 0.0
 
-def categorize_product(title: str) -> str:
-    """Categorize product from title"""
-    title_lower = title.lower()
-    
-    # Check for laptop Book models first
-    if "galaxy book" in title_lower or "surface book" in title_lower or "zenbook" in title_lower:
-        return "laptop"
-        
-    if any(word in title_lower for word in ["laptop", "macbook", "thinkpad", "chromebook", "notebook", "surface"]):
-        return "laptop"
-    elif any(word in title_lower for word in ["desktop", "gaming pc", "tower", "computer", "ibuypower", "cyberpower", "alienware", "mac studio", "mini"]):
-        return "desktop"
-    elif any(word in title_lower for word in ["headphone", "earbuds", "airpods", "speaker", "headset"]):
-        return "audio"
-    elif any(word in title_lower for word in ["keyboard", "mouse", "monitor", "webcam"]):
-        return "peripherals"
-    elif any(word in title_lower for word in ["phone", "iphone", "galaxy", "pixel", "android"]):
-        return "phone"
-    elif any(word in title_lower for word in ["watch", "wearable"]):
-        return "wearable"
-    elif any(word in title_lower for word in ["camera", "dslr", "mirrorless"]):
-        return "camera"
-    elif any(word in title_lower for word in ["tv", "television", "oled"]):
-        return "tv"
-    else:
-        return "electronics"
-
 def extract_specs(item: Dict) -> Dict[str, str]:
     """Extract key specs from product data"""
     specs = {}
@@ -145,27 +288,26 @@ def extract_specs(item: Dict) -> Dict[str, str]:
         elif ("ram" in ext_lower or "memory" in ext_lower) and "Memory" not in specs:
             specs["Memory"] = ext_str
             
-    # Extract from title as fallback
+    # Extract from title as fallback (patterns precompiled in spec_parser)
     title = item.get("title", "")
-    import re
     
     if "Storage" not in specs:
-        storage_match = re.search(r'(\d+(?:TB|GB))\s*(?:SSD|HDD|Storage)?', title, re.IGNORECASE)
+        storage_match = STORAGE_TITLE_RE.search(title)
         if storage_match:
-            specs["Storage"] = storage_match.group(1).upper()
+            specs["Storage"] = f"{storage_match.group(1)}{storage_match.group(2).upper()}"
             
     if "Memory" not in specs:
-        ram_match = re.search(r'(\d+)\s*GB\s*(?:RAM|Memory)?', title, re.IGNORECASE)
+        ram_match = MEMORY_TITLE_RE.search(title)
         if ram_match:
             specs["Memory"] = f"{ram_match.group(1)}GB"
             
     if "Display" not in specs:
-        screen_match = re.search(r'(\d+(?:\.\d+)?)(?:\s*\"|\s*inch)', title, re.IGNORECASE)
+        screen_match = DISPLAY_TITLE_RE.search(title)
         if screen_match:
             specs["Display"] = f"{screen_match.group(1)}\""
             
     if "Processor" not in specs:
-        cpu_match = re.search(r'(M[1-4]\s*(?:Pro|Max|Ultra)?|Core\s*i\d|Ryzen\s*\d|Snapdragon|Tensor)', title, re.IGNORECASE)
+        cpu_match = CPU_TITLE_RE.search(title)
         if cpu_match:
             specs["Processor"] = cpu_match.group(1)
             
@@ -183,45 +325,3 @@ def extract_specs(item: Dict) -> Dict[str, str]:
         specs["Summary"] = "No detailed specifications available via API."
         
     return specs
-
-def generate_tags(title: str) -> List[str]:
-    """Generate tags from title"""
-    tags = []
-    title_lower = title.lower()
-    
-    if "pro" in title_lower or "premium" in title_lower or "ultra" in title_lower or "max" in title_lower:
-        tags.append("premium")
-    if "gaming" in title_lower or "rgb" in title_lower or "rtx" in title_lower:
-        tags.append("gaming")
-    if "wireless" in title_lower or "bluetooth" in title_lower:
-        tags.append("wireless")
-    if "eco" in title_lower or "sustainable" in title_lower:
-        tags.append("eco-friendly")
-        
-    return tags
-
-def calculate_repairability(title: str) -> int:
-    """Estimate repairability score (1-10)"""
-    title_lower = title.lower()
-    
-    # High repairability brands
-    if any(brand in title_lower for brand in ["framework", "fairphone", "system76"]):
-        return 9
-    
-    # Good repairability
-    if any(brand in title_lower for brand in ["thinkpad", "elitebook", "latitude", "dell", "lenovo"]):
-        return 7
-    
-    # Moderate
-    if any(brand in title_lower for brand in ["asus", "acer", "hp", "msi", "samsung"]):
-        return 6
-        
-    # Low repairability (glued, soldered)
-    if any(brand in title_lower for brand in ["macbook", "apple", "ipad", "iphone", "surface", "microsoft"]):
-        return 3
-        
-    # Very low/Disposable
-    if any(word in title_lower for word in ["airpods", "buds", "disposable"]):
-        return 1
-        
-    return 5  # Default average
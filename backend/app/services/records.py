@@ -0,0 +1,160 @@
+"""
+Compact product and analysis records.
+
+Products flow from search through every graph node; slotted records avoid
+a per-product __dict__ and key hashing, and copy without walking nested
+dicts generically. Convert with to_dict() only at the API boundary.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ANALYSIS_FIELDS = (
+    "value_score", "hidden_cost_risk", "deal_timing",          # Critic
+    "repairability_confidence", "longevity_score",             # Guardian
+    "cognitive_load",                                          # Mentor
+)
+
+class ProductAnalysis:
+    """Evaluator output for one product; unset fields are None"""
+
+    __slots__ = ANALYSIS_FIELDS
+
+    def __init__(
+        self,
+        value_score: Optional[int] = None,
+        hidden_cost_risk: Optional[str] = None,
+        deal_timing: Optional[str] = None,
+        repairability_confidence: Optional[str] = None,
+        longevity_score: Optional[str] = None,
+        cognitive_load: Optional[str] = None
+    ):
+        self.value_score = value_score
+        self.hidden_cost_risk = hidden_cost_risk
+        self.deal_timing = deal_timing
+        self.repairability_confidence = repairability_confidence
+        self.longevity_score = longevity_score
+        self.cognitive_load = cognitive_load
+
+    def copy(self) -> "ProductAnalysis":
+        return ProductAnalysis(*(getattr(self, field) for field in ANALYSIS_FIELDS))
+
+    def merged(self, other: Optional["ProductAnalysis"]) -> "ProductAnalysis":
+        """New record with other's set fields layered over this one's"""
+        result = ProductAnalysis()
+        for field in ANALYSIS_FIELDS:
+            value = getattr(other, field) if other is not None else None
+            setattr(result, field, value if value is not None else getattr(self, field))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            field: value for field in ANALYSIS_FIELDS
+            if (value := getattr(self, field)) is not None
+        }
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ProductAnalysis) and all(
+            getattr(self, f) == getattr(other, f) for f in ANALYSIS_FIELDS
+        )
+
+    def __repr__(self) -> str:
+        return f"ProductAnalysis({self.to_dict()})"
+
+class Product:
+    """One candidate product, normalized from SerpAPI or the local catalog"""
+
+    __slots__ = (
+        "id", "name", "price", "image_url", "link", "source", "rating", "reviews",
+        "category", "specs", "spec_values", "repairability_score", "tags", "analysis",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        price: float,
+        image_url: str = "",
+        link: str = "",
+        source: str = "",
+        rating: float = 0,
+        reviews: int = 0,
+        category: str = "electronics",
+        specs: Optional[Dict[str, Any]] = None,
+        spec_values: Optional[Dict[str, Any]] = None,
+        repairability_score: int = 5,
+        tags: Iterable[str] = (),
+        analysis: Optional[ProductAnalysis] = None
+    ):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.image_url = image_url
+        self.link = link
+        self.source = source
+        self.rating = rating
+        self.reviews = reviews
+        self.category = category
+        self.specs = specs if specs is not None else {}
+        self.spec_values = spec_values if spec_values is not None else {}
+        self.repairability_score = repairability_score
+        self.tags: Tuple[str, ...] = tuple(tags)
+        self.analysis = analysis
+
+    def copy(self) -> "Product":
+        """Independent copy; specs and spec_values are flat so one level suffices"""
+        return Product(
+            self.id, self.name, self.price, self.image_url, self.link, self.source,
+            self.rating, self.reviews, self.category, dict(self.specs), dict(self.spec_values),
+            self.repairability_score, self.tags,
+            self.analysis.copy() if self.analysis is not None else None
+        )
+
+    def __deepcopy__(self, memo) -> "Product":
+        return self.copy()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict in the API's flat product shape (analysis fields inlined)"""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "price": self.price,
+            "image_url": self.image_url,
+            "link": self.link,
+            "source": self.source,
+            "rating": self.rating,
+            "reviews": self.reviews,
+            "category": self.category,
+            "specs": self.specs,
+            "spec_values": self.spec_values,
+            "repairability_score": self.repairability_score,
+            "tags": list(self.tags),
+        }
+        if self.analysis is not None:
+            data.update(self.analysis.to_dict())
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Product":
+        analysis = {f: data[f] for f in ANALYSIS_FIELDS if data.get(f) is not None}
+        return cls(
+            id=data["id"],
+            name=data.get("name", "Unknown Product"),
+            price=data.get("price", 0),
+            image_url=data.get("image_url", ""),
+            link=data.get("link", ""),
+            source=data.get("source", ""),
+            rating=data.get("rating", 0),
+            reviews=data.get("reviews", 0),
+            category=data.get("category", "electronics"),
+            specs=dict(data.get("specs") or {}),
+            spec_values=dict(data.get("spec_values") or {}),
+            repairability_score=data.get("repairability_score", 5),
+            tags=data.get("tags", ()),
+            analysis=ProductAnalysis(**analysis) if analysis else None
+        )
+
+    def __repr__(self) -> str:
+        return f"Product(id={self.id!r}, name={self.name!r}, price={self.price!r})"
+
+def products_to_json(products: List[Product]) -> List[Dict[str, Any]]:
+    return [p.to_dict() for p in products]
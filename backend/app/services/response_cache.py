@@ -0,0 +1,124 @@
+"""Bounded /chat response cache with stale-while-revalidate"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+from app.services.search_cache import normalize_query
+from app.services.identity import identity_hash
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))  # fresh for (seconds)
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "3600"))  # servable while stale for
+
+def make_response_key(message: str, identity: Dict[str, Any]) -> str:
+    return f"{identity_hash(identity)}|{normalize_query(message)}"
+
+class ResponseCache:
+    """
+    LRU cache of computed responses.
+
+    Entries younger than `ttl` are served as-is. Entries older than `ttl` but
+    younger than `ttl + stale_ttl` are served immediately while a single
+    background task recomputes them. Anything older is recomputed inline.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 300, stale_ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = now - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._schedule_refresh(key, compute, should_cache)
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        value = await compute()
+        if should_cache(value):
+            self._store(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, compute, should_cache):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, compute, should_cache))
+        # Hold a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, compute, should_cache):
+        try:
+            value = await compute()
+            if should_cache(value):
+                self._store(key, value)
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the stale entry; the next stale hit retries
+            print(f"Response cache refresh error: {e}")
+            self.refresh_errors += 1
+        finally:
+            self._refreshing.discard(key)
+
+    def _store(self, key: str, value: Any):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
+
+response_cache = ResponseCache(
+    max_size=RESPONSE_CACHE_SIZE,
+    ttl=RESPONSE_CACHE_TTL,
+    stale_ttl=RESPONSE_CACHE_STALE_TTL
+)
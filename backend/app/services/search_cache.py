@@ -0,0 +1,185 @@
+"""TTL/LRU cache for product search results with optional SQLite persistence"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.services.records import Product
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))  # seconds
+SEARCH_CACHE_DB = os.getenv("SEARCH_CACHE_DB", "")  # e.g. data/search_cache.sqlite3
+SEARCH_CACHE_PRUNE_INTERVAL = float(os.getenv("SEARCH_CACHE_PRUNE_INTERVAL", "300"))  # seconds between expired-row sweeps
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key"""
+    return " ".join(query.lower().split())
+
+def make_cache_key(query: str, max_results: int, gl: str) -> str:
+    return f"{gl.lower()}|{max_results}|{normalize_query(query)}"
+
+class SearchCache:
+    """
+    Two-tier search result cache.
+
+    Tier 1 is a bounded in-memory LRU. Tier 2 is an optional SQLite table
+    that survives restarts; entries found there are promoted back into
+    memory. Both tiers honour the same TTL.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 900, db_path: str = "",
+                 prune_interval: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._entries: "OrderedDict[str, Tuple[float, List[Product]]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier only; never held during disk I/O
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes: "queue.Queue[tuple]" = queue.Queue()
+        self._last_prune = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, products TEXT NOT NULL)"
+            )
+            self._db.commit()
+            # One writer thread owns all writes so set() never blocks on disk
+            threading.Thread(target=self._write_loop, name="search-cache-writer", daemon=True).start()
+
+    def _memory_get(self, key: str, now: float) -> Optional[List[Product]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, products = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    # Callers mutate products downstream
+                    return [p.copy() for p in products]
+                del self._entries[key]
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def _disk_get(self, key: str, now: float) -> Optional[List[Product]]:
+        """Look the key up in SQLite and promote a live row into memory"""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT stored_at, products FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row and now - row[0] <= self.ttl:
+            products = [Product.from_dict(p) for p in json.loads(row[1])]
+            with self._lock:
+                self._store(key, row[0], products)
+                self.hits += 1
+                self.disk_hits += 1
+            return [p.copy() for p in products]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, key: str) -> Optional[List[Product]]:
+        """Return a copy of the cached products, or None on miss/expiry"""
+        now = time.time()
+        products = self._memory_get(key, now)
+        if products is not None or self._db is None:
+            return products
+        return self._disk_get(key, now)
+
+    async def aget(self, key: str) -> Optional[List[Product]]:
+        """get() for the event loop: memory hits stay inline, disk lookups run in a thread"""
+        now = time.time()
+        products = self._memory_get(key, now)
+        if products is not None or self._db is None:
+            return products
+        return await asyncio.to_thread(self._disk_get, key, now)
+
+    def set(self, key: str, products: List[Product]):
+        now = time.time()
+        products = [p.copy() for p in products]
+        with self._lock:
+            self._store(key, now, products)
+        if self._db is not None:
+            # The stored copies are never handed out, so the writer can serialize them later
+            self._writes.put(("set", key, now, products))
+
+    def _write_loop(self):
+        while True:
+            op = self._writes.get()
+            try:
+                with self._db_lock:
+                    if op[0] == "set":
+                        _, key, stored_at, products = op
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO search_cache (key, stored_at, products) VALUES (?, ?, ?)",
+                            (key, stored_at, json.dumps([p.to_dict() for p in products]))
+                        )
+                    else:
+                        self._db.execute("DELETE FROM search_cache")
+                    now = time.time()
+                    if now - self._last_prune >= self.prune_interval:
+                        self._db.execute(
+                            "DELETE FROM search_cache WHERE stored_at < ?", (now - self.ttl,)
+                        )
+                        self._last_prune = now
+                    self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Search cache write failed: {e}")
+            finally:
+                self._writes.task_done()
+
+    def flush(self):
+        """Block until queued disk writes are committed"""
+        if self._db is not None:
+            self._writes.join()
+
+    def _store(self, key: str, stored_at: float, products: List[Product]):
+        """Insert into the memory tier and evict LRU entries (lock must be held)"""
+        self._entries[key] = (stored_at, products)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            self._writes.put(("clear",))
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+search_cache = SearchCache(
+    max_size=SEARCH_CACHE_SIZE,
+    ttl=SEARCH_CACHE_TTL,
+    db_path=SEARCH_CACHE_DB,
+    prune_interval=SEARCH_CACHE_PRUNE_INTERVAL
+)
@@ -0,0 +1,147 @@
+"""
+Typed spec parsing.
+
+Patterns are compiled once at import. parse_spec_values turns the display
+strings produced by extract_specs (e.g. "512GB", "15.6\"", "144Hz") into
+numeric fields so products can be filtered and ranked without reparsing
+text on every request.
+"""
+
+import re
+from typing import Dict, Any, Optional
+
+# Title fallbacks, shared by extract_specs (display strings) and parse_spec_values.
+# Sizes only count with their kind next to them: "16GB RAM 512GB SSD" must not
+# read as 16GB of storage, so an unlabelled size is left unset.
+STORAGE_TITLE_RE = re.compile(
+    r'(?<![\d.])(\d+)\s*(TB|GB)\s*(?:(?:PCIe|NVMe|M\.2|Gen\s*\d)\s*)*(?:SSD|HDD|Storage|eMMC)\b',
+    re.IGNORECASE
+)
+MEMORY_TITLE_RE = re.compile(
+    r'(?<![\d.])(\d+)\s*(GB)\s*(?:(?:LP)?DDR\d\w*\s*)?(?:RAM|Memory|Unified\s+Memory)\b',
+    re.IGNORECASE
+)
+DISPLAY_TITLE_RE = re.compile(r'(\d+(?:\.\d+)?)(?:\s*\"|\s*inch)', re.IGNORECASE)
+CPU_TITLE_RE = re.compile(r'(M[1-4]\s*(?:Pro|Max|Ultra)?|Core\s*i\d|Ryzen\s*\d|Snapdragon|Tensor)', re.IGNORECASE)
+
+# Typed value patterns
+_SIZE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB|MB)\b', re.IGNORECASE)
+_INCHES_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:\"|”|\'\'|-?\s*inch(?:es)?\b|in\b)', re.IGNORECASE)
+_MEMORY_WORD_RE = re.compile(r'\b(?:RAM|memory)\b', re.IGNORECASE)
+_BARE_NUMBER_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*$')
+_HZ_RE = re.compile(r'(\d+(?:\.\d+)?)\s*Hz\b', re.IGNORECASE)
+_MEMORY_REQ_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB)\s*(?:of\s+)?(?:ram|memory|unified memory)\b', re.IGNORECASE)
+_STORAGE_REQ_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB)\s*(?:of\s+)?(?:ssd|hdd|storage|nvme)\b', re.IGNORECASE)
+
+_CPU_FAMILY_RES = [
+    (re.compile(r'\bM([1-4])\s*(Pro|Max|Ultra)?\b', re.IGNORECASE),
+     lambda m: f"apple-m{m.group(1)}" + (f"-{m.group(2).lower()}" if m.group(2) else "")),
+    (re.compile(r'\bCore\s*(?:i|Ultra\s*)(\d)\b', re.IGNORECASE), lambda m: f"intel-core-{m.group(1)}"),
+    (re.compile(r'\bRyzen\s*(?:AI\s*)?(\d)\b', re.IGNORECASE), lambda m: f"amd-ryzen-{m.group(1)}"),
+    (re.compile(r'\bSnapdragon\b', re.IGNORECASE), lambda m: "snapdragon"),
+    (re.compile(r'\bTensor\b', re.IGNORECASE), lambda m: "google-tensor"),
+]
+
+# Spec keys (lowercase) that may hold each value, in both SerpAPI and catalog shapes
+STORAGE_KEYS = {"storage"}
+MEMORY_KEYS = {"memory", "ram"}
+DISPLAY_KEYS = {"display", "screen"}
+REFRESH_KEYS = {"refresh rate", "hz", "screen", "display", "res"}
+CPU_KEYS = {"processor", "cpu", "chip"}
+
+_UNIT_TO_GB = {"tb": 1024.0, "gb": 1.0, "mb": 1 / 1024}
+
+def size_in_gb(text: str) -> Optional[float]:
+    match = _SIZE_RE.search(text)
+    if not match:
+        return None
+    return float(match.group(1)) * _UNIT_TO_GB[match.group(2).lower()]
+
+def display_inches(text: str) -> Optional[float]:
+    match = _INCHES_RE.search(text) or _BARE_NUMBER_RE.match(text)
+    if not match:
+        return None
+    inches = float(match.group(1))
+    # Anything outside this range is not a screen diagonal (e.g. "4K")
+    return inches if 3 <= inches <= 120 else None
+
+def refresh_hz(text: str) -> Optional[float]:
+    match = _HZ_RE.search(text)
+    return float(match.group(1)) if match else None
+
+def cpu_family(text: str) -> Optional[str]:
+    for pattern, normalize in _CPU_FAMILY_RES:
+        match = pattern.search(text)
+        if match:
+            return normalize(match)
+    return None
+
+def parse_spec_values(specs: Dict[str, Any], title: str = "") -> Dict[str, Any]:
+    """
+    Typed numeric view of a product's specs.
+
+    Returns any of storage_gb, memory_gb, display_in, refresh_hz and
+    cpu_family that could be determined; missing fields mean unknown.
+    """
+    values: Dict[str, Any] = {}
+    if not isinstance(specs, dict):
+        specs = {}
+
+    for key, raw in specs.items():
+        key = str(key).lower()
+        text = str(raw)
+        if key in STORAGE_KEYS and "storage_gb" not in values and not _MEMORY_WORD_RE.search(text):
+            gb = size_in_gb(text)
+            if gb is not None:
+                values["storage_gb"] = gb
+        if key in MEMORY_KEYS and "memory_gb" not in values:
+            gb = size_in_gb(text)
+            if gb is not None:
+                values["memory_gb"] = gb
+        if key in DISPLAY_KEYS and "display_in" not in values:
+            inches = display_inches(text)
+            if inches is not None:
+                values["display_in"] = inches
+        if key in REFRESH_KEYS and "refresh_hz" not in values:
+            hz = refresh_hz(text)
+            if hz is not None:
+                values["refresh_hz"] = hz
+        if key in CPU_KEYS and "cpu_family" not in values:
+            family = cpu_family(text)
+            if family:
+                values["cpu_family"] = family
+
+    if title:
+        for field, pattern in (("storage_gb", STORAGE_TITLE_RE), ("memory_gb", MEMORY_TITLE_RE)):
+            match = pattern.search(title) if field not in values else None
+            if match:
+                values[field] = float(match.group(1)) * _UNIT_TO_GB[match.group(2).lower()]
+
+    if "cpu_family" not in values and title:
+        family = cpu_family(title)
+        if family:
+            values["cpu_family"] = family
+
+    return values
+
+def parse_spec_requirements(query: str) -> Dict[str, float]:
+    """Minimum specs stated in a query, e.g. "laptop with 16gb ram" -> {"memory_gb": 16}"""
+    requirements = {}
+    match = _MEMORY_REQ_RE.search(query)
+    if match:
+        requirements["memory_gb"] = float(match.group(1)) * _UNIT_TO_GB[match.group(2).lower()]
+    match = _STORAGE_REQ_RE.search(query)
+    if match:
+        requirements["storage_gb"] = float(match.group(1)) * _UNIT_TO_GB[match.group(2).lower()]
+    hz = refresh_hz(query)
+    if hz is not None:
+        requirements["refresh_hz"] = hz
+    return requirements
+
+def meets_requirements(spec_values: Dict[str, Any], requirements: Dict[str, float]) -> bool:
+    """True unless a known spec value falls below a requirement (unknown values pass)"""
+    for field, minimum in requirements.items():
+        value = spec_values.get(field)
+        if value is not None and value < minimum:
+            return False
+    return True
@@ -0,0 +1,184 @@
+"""
+Single-pass product title classifier.
+
+All keyword lexicons used to interpret product titles live here. They are
+compiled into one Aho-Corasick automaton so a title is scanned once to get
+its category, tags, repairability, hidden-cost tier, deal flags and
+cognitive-load hint, instead of one substring scan per keyword list.
+Results are memoized by title.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Tuple, NamedTuple, Optional, Set
+
+# Category lexicon, checked in order; shared with onboarding's fast-path extractor
+CATEGORY_KEYWORDS = [
+    ("laptop", ["laptop", "macbook", "thinkpad", "chromebook", "notebook", "surface"]),
+    ("desktop", ["desktop", "gaming pc", "tower", "computer", "ibuypower", "cyberpower", "alienware", "mac studio", "mini"]),
+    ("audio", ["headphone", "earbuds", "airpods", "speaker", "headset"]),
+    ("peripherals", ["keyboard", "mouse", "monitor", "webcam"]),
+    ("phone", ["phone", "iphone", "galaxy", "pixel", "android"]),
+    ("wearable", ["watch", "wearable"]),
+    ("camera", ["camera", "dslr", "mirrorless"]),
+    ("tv", ["tv", "television", "oled"]),
+]
+
+# Laptop "Book" models that would otherwise match phone/laptop brands first
+LAPTOP_BOOK_KEYWORDS = ["galaxy book", "surface book", "zenbook"]
+
+TAG_KEYWORDS = [
+    ("premium", ["pro", "premium", "ultra", "max"]),
+    ("gaming", ["gaming", "rgb", "rtx"]),
+    ("wireless", ["wireless", "bluetooth"]),
+    ("eco-friendly", ["eco", "sustainable"]),
+]
+
+# Checked in order; first match wins, default 5
+REPAIRABILITY_TIERS = [
+    (9, ["framework", "fairphone", "system76"]),  # High repairability brands
+    (7, ["thinkpad", "elitebook", "latitude", "dell", "lenovo"]),  # Good repairability
+    (6, ["asus", "acer", "hp", "msi", "samsung"]),  # Moderate
+    (3, ["macbook", "apple", "ipad", "iphone", "surface", "microsoft"]),  # Low (glued, soldered)
+    (1, ["airpods", "buds", "disposable"]),  # Very low/Disposable
+]
+DEFAULT_REPAIRABILITY = 5
+
+HIDDEN_COST_KEYWORDS = [
+    ("High", ["apple", "macbook", "printer", "subscription"]),
+    ("Medium", ["razer", "alienware", "sony"]),
+]
+
+# Critic deal-timing flags (bitmask)
+HIGH_HIDDEN_COST = 1
+MEDIUM_HIDDEN_COST = 2
+REFURBISHED = 4
+NEW_RELEASE = 8
+
+DEAL_FLAG_KEYWORDS = [
+    (REFURBISHED, ["renewed", "refurbished"]),
+    (NEW_RELEASE, ["2024", "latest"]),
+]
+
+# Mentor cognitive-load hints; "technical" is resolved against the user's role
+COGNITIVE_KEYWORDS = [
+    ("technical", ["pro", "developer", "linux"]),
+    ("simple", ["macbook", "console", "iphone"]),
+]
+
+class TitleProfile(NamedTuple):
+    category: str
+    tags: Tuple[str, ...]
+    repairability: int
+    hidden_cost: str
+    flags: int
+    cognitive_hint: Optional[str]
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every label whose keyword occurs in a text"""
+
+    def __init__(self, keywords: Dict[str, Set[Tuple[str, object]]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[Set[Tuple[str, object]]] = [set()]
+
+        for keyword, labels in keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.output.append(set())
+                state = nxt
+            self.output[state] |= labels
+
+        # Breadth-first failure links; outputs inherit their suffixes' outputs
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+
+    def scan(self, text: str) -> Set[Tuple[str, object]]:
+        found = set()
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+def _build_automaton() -> KeywordAutomaton:
+    keywords: Dict[str, Set[Tuple[str, object]]] = {}
+
+    def add(group: str, value: object, words: List[str]):
+        for word in words:
+            keywords.setdefault(word, set()).add((group, value))
+
+    add("book", "laptop", LAPTOP_BOOK_KEYWORDS)
+    for category, words in CATEGORY_KEYWORDS:
+        add("category", category, words)
+    for tag, words in TAG_KEYWORDS:
+        add("tag", tag, words)
+    for score, words in REPAIRABILITY_TIERS:
+        add("repair", score, words)
+    for tier, words in HIDDEN_COST_KEYWORDS:
+        add("cost", tier, words)
+    for flag, words in DEAL_FLAG_KEYWORDS:
+        add("flag", flag, words)
+    for hint, words in COGNITIVE_KEYWORDS:
+        add("load", hint, words)
+    return KeywordAutomaton(keywords)
+
+_automaton = _build_automaton()
+
+@lru_cache(maxsize=16384)
+def classify_title(title: str) -> TitleProfile:
+    """Everything the agents derive from a product title, in one scan"""
+    labels = _automaton.scan(title.lower())
+
+    if ("book", "laptop") in labels:
+        category = "laptop"
+    else:
+        category = next(
+            (c for c, _ in CATEGORY_KEYWORDS if ("category", c) in labels),
+            "electronics"
+        )
+
+    tags = tuple(tag for tag, _ in TAG_KEYWORDS if ("tag", tag) in labels)
+
+    repairability = next(
+        (score for score, _ in REPAIRABILITY_TIERS if ("repair", score) in labels),
+        DEFAULT_REPAIRABILITY
+    )
+
+    hidden_cost = next(
+        (tier for tier, _ in HIDDEN_COST_KEYWORDS if ("cost", tier) in labels),
+        "Low"
+    )
+
+    flags = 0
+    if hidden_cost == "High":
+        flags |= HIGH_HIDDEN_COST
+    elif hidden_cost == "Medium":
+        flags |= MEDIUM_HIDDEN_COST
+    for flag, _ in DEAL_FLAG_KEYWORDS:
+        if ("flag", flag) in labels:
+            flags |= flag
+
+    cognitive_hint = next(
+        (hint for hint, _ in COGNITIVE_KEYWORDS if ("load", hint) in labels),
+        None
+    )
+
+    return TitleProfile(category, tags, repairability, hidden_cost, flags, cognitive_hint)
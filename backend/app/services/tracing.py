@@ -0,0 +1,191 @@
+"""
+Lightweight request tracing.
+
+Spans nest through a context variable, so child tasks started with
+asyncio.gather inherit their parent. Finished spans go to the configured
+exporter; the JSON-lines exporter writes one span per line so critical
+paths can be reconstructed offline (group by trace_id, link by parent_id).
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# none, jsonl or console
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attributes", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.time()
+            _exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((self.end - self.start) * 1000, 3) if self.end else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+class SpanExporter:
+    """Receives every finished span; subclass and pass to set_exporter"""
+
+    def export(self, span: Span):
+        pass
+
+    def shutdown(self):
+        pass
+
+class JsonLinesExporter(SpanExporter):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+class ConsoleExporter(SpanExporter):
+    def export(self, span: Span):
+        data = span.to_dict()
+        print(f"🧵 {data['name']} {data['duration_ms']}ms [{data['status']}] {data['attributes']}")
+
+class InMemoryExporter(SpanExporter):
+    """Keeps finished spans in a list; handy for benchmarks and debugging"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+def _default_exporter() -> SpanExporter:
+    if TRACE_EXPORTER == "jsonl":
+        return JsonLinesExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "console":
+        return ConsoleExporter()
+    return SpanExporter()
+
+_exporter: SpanExporter = _default_exporter()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def set_exporter(exporter: SpanExporter):
+    global _exporter
+    _exporter.shutdown()
+    _exporter = exporter
+
+def shutdown_tracing():
+    _exporter.shutdown()
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+def annotate(**attributes):
+    """Set attributes on the current span, if any"""
+    s = _current.get()
+    if s is not None:
+        s.set(**attributes)
+
+def start_span(name: str, **attributes) -> Span:
+    """Start a child of the current span without making it current; call finish()"""
+    return Span(name, _current.get(), attributes)
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Run the block inside a new span, recording any exception on it"""
+    s = Span(name, _current.get(), attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.record_error(e)
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Closed from another context (e.g. an abandoned stream); nothing to restore
+            pass
+        s.finish()
+
+def token_usage(response) -> tuple:
+    """(prompt, completion) tokens from an LLMResult, 0 when not reported"""
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+class LLMSpanCallback(BaseCallbackHandler):
+    """Opens a span per LLM call, tagged with the caller and token usage"""
+
+    # Run on the event loop so the current span is the caller's
+    run_inline = True
+
+    def __init__(self, caller: str):
+        self.caller = caller
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        prompt_chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        self._spans[run_id] = start_span(f"llm.{self.caller}", caller=self.caller, prompt_chars=prompt_chars)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._spans[run_id] = start_span(f"llm.{self.caller}", caller=self.caller, prompt_chars=sum(map(len, prompts)))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        s = self._spans.pop(run_id, None)
+        if s:
+            prompt_tokens, completion_tokens = token_usage(response)
+            s.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            s.finish()
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        s = self._spans.pop(run_id, None)
+        if s:
+            s.record_error(error)
+            s.finish()
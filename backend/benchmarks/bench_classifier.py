@@ -0,0 +1,63 @@
+"""
+Time the single-pass title classifier against the per-list keyword scans
+it replaced. Parity is checked first; the reference scans and the check
+itself live in tests/test_title_classifier.py.
+
+Usage (from backend/):
+    python -m benchmarks.bench_classifier
+"""
+
+import time
+from typing import List
+
+from app.services.title_classifier import classify_title
+from tests.test_title_classifier import (
+    make_titles, check_parity, reference_category, reference_tags, reference_repairability,
+    reference_hidden_cost, reference_name_flags, reference_cognitive_hint
+)
+
+N_TITLES = 5000
+REPEATS = 5
+
+def per_list_scans(titles: List[str]):
+    for title in titles:
+        reference_category(title)
+        reference_tags(title)
+        reference_repairability(title)
+        reference_hidden_cost(title)
+        reference_name_flags(title)
+        reference_cognitive_hint(title)
+
+def classifier_cold(titles: List[str]):
+    classify_title.cache_clear()
+    for title in titles:
+        classify_title(title)
+
+def classifier_warm(titles: List[str]):
+    for title in titles:
+        classify_title(title)
+
+def best_of(fn, titles) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(titles)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    titles = make_titles(N_TITLES)
+    check_parity(titles)
+    print(f"Parity check passed on {len(titles)} titles.\n")
+
+    scans = best_of(per_list_scans, titles)
+    cold = best_of(classifier_cold, titles)
+    classifier_warm(titles)
+    warm = best_of(classifier_warm, titles)
+    per_title = 1e6 / len(titles)
+    print(f"{'per-list scans':<22} {scans * per_title:8.2f} us/title")
+    print(f"{'classifier (cold)':<22} {cold * per_title:8.2f} us/title")
+    print(f"{'classifier (memoized)':<22} {warm * per_title:8.2f} us/title")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Offline benchmark of the /chat pipeline.
+
+SerpAPI is served from recorded Google Shopping responses
+(fixtures/serpapi_shopping.json) through an in-process transport, and the
+Mentor LLM is replaced by a deterministic fake that streams a fixed reply.
+Both can be given a simulated upstream latency. Reports per-node latency
+percentiles, end-to-end /chat throughput at several concurrency levels and
+peak memory, and writes the results as JSON for comparison across commits.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline [--output results.json]
+        [--requests 40] [--concurrency 1,4,16]
+        [--serp-latency-ms 150] [--llm-latency-ms 400] [--warm-cache]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Any, Optional
+from uuid import UUID
+
+# The app refuses to run agents without an OpenRouter key; none is used here
+os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+os.environ.setdefault("SERPAPI_API_KEY", "bench")
+os.environ.setdefault("SEARCH_BACKEND", "serpapi")
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app import main as app_main
+from app.agents import graph as graph_module
+from app.services import product_search
+from app.services.search_cache import search_cache
+from app.services.response_cache import response_cache
+from benchmarks.common import SerpApiFixtures, SERPAPI_FIXTURES, percentiles
+
+DEFAULT_OUTPUT = "benchmarks/results/pipeline.json"
+NODES = ("scout", "critic", "guardian", "mentor")
+
+IDENTITY = {
+    "role": "Software Developer",
+    "budget": {"preferred": 1200, "maximum": 1500},
+    "values": ["repairability", "performance"],
+}
+QUERIES = [
+    "laptop for coding",
+    "gaming monitor",
+    "mechanical keyboard",
+    "noise cancelling headphones",
+    "smartphone with good camera",
+]
+
+MENTOR_REPLY = (
+    "Here is how these options line up with what you asked for:\n\n"
+    "- **Best overall**: strong value score and a repairability rating that fits your priorities.\n"
+    "- **Budget pick**: covers the essentials and leaves room in your budget.\n"
+    "- **Performance pick**: the fastest option here if you can stretch a little.\n\n"
+    "All three are well reviewed; the first is the one I would start with."
+)
+
+class FakeLLM:
+    """Deterministic stand-in for the OpenRouter chat model"""
+
+    def __init__(self, latency: float = 0.0, reply: str = MENTOR_REPLY, tokens: int = 40):
+        self.latency = latency
+        self.reply = reply
+        words = reply.split(" ")
+        step = max(1, len(words) // tokens)
+        self.chunks = [" ".join(words[i:i + step]) + " " for i in range(0, len(words), step)]
+        self.chunks[-1] = self.chunks[-1].rstrip()
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=self.reply)
+
+    async def astream(self, messages, *args, **kwargs):
+        self.calls += 1
+        # Time to first token, then the rest of the reply spread evenly
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(self.latency / 2)
+        per_chunk = self.latency / 2 / len(self.chunks)
+        for i, chunk in enumerate(self.chunks, 1):
+            # Sleep to a fixed schedule so timer granularity doesn't accumulate
+            delay = start + self.latency / 2 + i * per_chunk - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+
+class FixtureSerpApi:
+    """httpx transport handler answering SerpAPI requests from recorded responses"""
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.fixtures = SerpApiFixtures(path)
+        self.latency = latency
+        self.calls = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json=self.fixtures.lookup(request.url.params.get("q", "")))
+
+class NodeTimer(AsyncCallbackHandler):
+    """Records the wall time of each LangGraph node run"""
+
+    def __init__(self):
+        self.started: Dict[UUID, tuple] = {}
+        self.durations: Dict[str, List[float]] = {node: [] for node in NODES}
+
+    async def on_chain_start(self, serialized, inputs, *, run_id, name=None, metadata=None, **kwargs):
+        if name in self.durations and (metadata or {}).get("langgraph_node") == name:
+            self.started[run_id] = (name, time.perf_counter())
+
+    async def on_chain_end(self, outputs, *, run_id, **kwargs):
+        entry = self.started.pop(run_id, None)
+        if entry:
+            name, start = entry
+            self.durations[name].append(time.perf_counter() - start)
+
+    async def on_chain_error(self, error, *, run_id, **kwargs):
+        self.started.pop(run_id, None)
+
+def reset_caches(warm: bool):
+    search_cache.clear()
+    response_cache.clear()
+    if not warm:
+        # A zero-size cache evicts every entry as soon as it is stored
+        search_cache.max_size = 0
+        response_cache.max_size = 0
+
+async def bench_nodes(n: int) -> Dict[str, Any]:
+    """Run the graph directly, one request at a time, timing each node"""
+    timer = NodeTimer()
+    search_times: List[float] = []
+    find_products = product_search.find_products
+
+    async def timed_find_products(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await find_products(*args, **kwargs)
+        finally:
+            search_times.append(time.perf_counter() - start)
+
+    # scout_node imports find_products at call time, so patching the module is enough
+    product_search.find_products = timed_find_products
+    try:
+        for i in range(n):
+            request = app_main.ChatRequest(message=QUERIES[i % len(QUERIES)], identity=IDENTITY)
+            await graph_module.graph.ainvoke(
+                app_main.build_initial_state(request),
+                config={"callbacks": [timer]}
+            )
+    finally:
+        product_search.find_products = find_products
+
+    nodes = {node: percentiles(samples) for node, samples in timer.durations.items()}
+    nodes["search_products"] = percentiles(search_times)
+    return nodes
+
+async def bench_throughput(n: int, concurrency: int) -> Dict[str, Any]:
+    """Drive POST /chat through the ASGI app with `concurrency` clients in flight"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(n))
+
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                payload = {"message": QUERIES[i % len(QUERIES)], "identity": IDENTITY}
+                start = time.perf_counter()
+                response = await client.post("/chat", json=payload)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200 or not response.json().get("products"):
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": n,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(n / elapsed, 2),
+        "latency": percentiles(latencies),
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+async def run(args) -> Dict[str, Any]:
+    serpapi = FixtureSerpApi(args.fixtures, args.serp_latency_ms / 1000)
+    llm = FakeLLM(args.llm_latency_ms / 1000)
+    graph_module.llm = llm
+    product_search._async_client = httpx.AsyncClient(transport=httpx.MockTransport(serpapi))
+    reset_caches(args.warm_cache)
+
+    try:
+        nodes = await bench_nodes(args.node_runs)
+        throughput = []
+        for concurrency in args.concurrency:
+            reset_caches(args.warm_cache)
+            throughput.append(await bench_throughput(args.requests, concurrency))
+            print(f"concurrency {concurrency:>3}: {throughput[-1]['throughput_rps']:>8.2f} req/s, "
+                  f"p99 {throughput[-1]['latency']['p99_ms']} ms", file=sys.stderr)
+
+        # Separate pass so allocation tracing doesn't skew the timings above
+        reset_caches(args.warm_cache)
+        tracemalloc.start()
+        try:
+            await bench_throughput(args.requests, max(args.concurrency))
+            _, peak_traced = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        await product_search.close_search_client()
+
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "serp_latency_ms": args.serp_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "warm_cache": args.warm_cache,
+            "upstream_calls": {"serpapi": serpapi.calls, "llm": llm.calls},
+        },
+        "nodes": nodes,
+        "throughput": throughput,
+        "memory": {
+            # Python allocations during /chat at the highest concurrency level
+            "peak_traced_mb": round(peak_traced / (1024 * 1024), 2),
+            "peak_rss_mb": peak_rss_mb(),
+        },
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=SERPAPI_FIXTURES)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--node-runs", type=int, default=50, help="sequential graph runs for node timings")
+    parser.add_argument("--requests", type=int, default=40, help="/chat requests per concurrency level")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16])
+    parser.add_argument("--serp-latency-ms", type=float, default=150)
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--warm-cache", action="store_true", help="keep the search and response caches enabled")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"\nWrote {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark Scout's top-k ranking as the candidate pool grows.
+
+Compares the single-pass heap selection with scoring and fully sorting
+every candidate, after checking both pick the same products.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ranking
+"""
+
+import random
+import time
+from typing import List
+
+from app.agents.ranking import top_k, score_product, query_terms, SCOUT_RANK_WEIGHTS
+from app.services.records import Product
+
+SIZES = [20, 100, 1000, 10000]
+REPEATS = 20
+K = 8
+BUDGET = 1500
+QUERY = "lightweight laptop for coding"
+
+NAME_PARTS = [
+    "Apple MacBook Air", "Lenovo ThinkPad X1 Carbon", "Framework Laptop 13", "Dell XPS 15",
+    "ASUS ROG Zephyrus", "Samsung Galaxy Book3", "HP Spectre x360", "LG UltraFine Monitor",
+    "Keychron K2 Keyboard", "Sony WH-1000XM5 Headphones",
+]
+
+def make_products(n: int, seed: int = 0) -> List[Product]:
+    rng = random.Random(seed)
+    return [
+        Product(
+            id=f"bench-{rng.randint(0, n)}",  # some duplicate ids, as with repeated listings
+            name=f"{rng.choice(NAME_PARTS)} {rng.choice(['', 'Lightweight', 'Gaming'])}",
+            price=round(rng.uniform(50, 2500), 2),
+            rating=round(rng.uniform(3, 5), 1),
+            reviews=rng.randint(0, 5000),
+            repairability_score=rng.randint(1, 10),
+            tags=rng.sample(["laptop", "premium", "portable", "gaming"], 2),
+        )
+        for _ in range(n)
+    ]
+
+def sort_all(products: List[Product]) -> List[Product]:
+    """Reference: score every unique product and sort the whole pool"""
+    terms = query_terms(QUERY)
+    unique = {}
+    for index, p in enumerate(products):
+        unique.setdefault(p.id, (index, p))
+    ranked = sorted(
+        unique.values(),
+        key=lambda item: (score_product(item[1], terms, BUDGET, SCOUT_RANK_WEIGHTS), -item[0]),
+        reverse=True
+    )
+    return [p for _, p in ranked[:K]]
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    for seed in range(5):
+        products = make_products(2000, seed)
+        assert top_k(products, QUERY, BUDGET, K) == sort_all(products), f"mismatch (seed={seed})"
+    print("Equivalence check passed.\n")
+    print(f"{'n':>7}  {'heap top-k (ms)':>15}  {'full sort (ms)':>14}  {'per item (us)':>13}")
+    for n in SIZES:
+        products = make_products(n)
+        heap = best_of(lambda: top_k(products, QUERY, BUDGET, K))
+        full = best_of(lambda: sort_all(products))
+        print(f"{n:>7}  {heap * 1000:>15.3f}  {full * 1000:>14.3f}  {heap / n * 1e6:>13.2f}")
+
+if __name__ == "__main__":
+    main()
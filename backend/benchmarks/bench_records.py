@@ -0,0 +1,105 @@
+"""
+Benchmark slotted Product records against the plain dicts they replaced.
+
+Measures memory held by N normalized products (with analysis attached),
+the cost of copying them the way the search cache does, and the one-off
+to_dict() conversion at the API boundary.
+
+Usage (from backend/):
+    python -m benchmarks.bench_records [--n 10000]
+"""
+
+import argparse
+import copy
+import gc
+import random
+import time
+import tracemalloc
+from typing import List, Dict, Any, Callable
+
+from app.services.records import Product, products_to_json
+
+REPEATS = 5
+
+NAME_PARTS = [
+    "Apple MacBook Air", "Lenovo ThinkPad X1", "Framework Laptop 13", "Dell XPS 15",
+    "Sony WH-1000XM5", "ASUS ROG Zephyrus", "Samsung Galaxy Book3", "HP Spectre x360",
+]
+
+def make_dicts(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Products in the old dict shape: search fields plus inlined analysis"""
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        name = f"{rng.choice(NAME_PARTS)} {rng.randint(1, 200)}"
+        products.append({
+            "id": f"serp-{i}",
+            "name": name,
+            "price": round(rng.uniform(50, 4000), 2),
+            "image_url": f"https://example.com/img/{i}.jpg",
+            "link": f"https://example.com/p/{i}",
+            "source": "Google Shopping",
+            "rating": round(rng.uniform(3, 5), 1),
+            "reviews": rng.randint(0, 5000),
+            "category": "laptop",
+            "specs": {"Storage": "512GB", "Memory": "16GB"},
+            "spec_values": {"storage_gb": 512, "memory_gb": 16},
+            "repairability_score": rng.randint(1, 10),
+            "tags": ["laptop", "premium"],
+            "value_score": rng.randint(0, 100),
+            "hidden_cost_risk": "Low",
+            "deal_timing": "Buy Now",
+            "repairability_confidence": "Medium",
+            "longevity_score": "3-4 Years",
+            "cognitive_load": "Medium",
+        })
+    return products
+
+def make_records(n: int, seed: int = 0) -> List[Product]:
+    return [Product.from_dict(p) for p in make_dicts(n, seed)]
+
+def measure_memory(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by build()'s result after it returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+def best_of(fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=10000)
+    args = parser.parse_args(argv)
+    n = args.n
+
+    # The analysis strings are shared constants in both shapes, as in the graph
+    dict_bytes = measure_memory(lambda: make_dicts(n))
+    record_bytes = measure_memory(lambda: make_records(n))
+
+    dicts = make_dicts(n)
+    records = make_records(n)
+    assert products_to_json(records) == dicts, "records do not round-trip to the API shape"
+
+    dict_copy = best_of(lambda: copy.deepcopy(dicts))
+    record_copy = best_of(lambda: [p.copy() for p in records])
+    to_json = best_of(lambda: products_to_json(records))
+
+    print(f"{n} products with analysis attached\n")
+    print(f"{'':<22}{'dict':>12}{'Product':>12}{'ratio':>8}")
+    print(f"{'memory (KiB)':<22}{dict_bytes / 1024:>12.0f}{record_bytes / 1024:>12.0f}{dict_bytes / record_bytes:>7.2f}x")
+    print(f"{'cache copy (ms)':<22}{dict_copy * 1000:>12.2f}{record_copy * 1000:>12.2f}{dict_copy / record_copy:>7.2f}x")
+    print(f"{'to_dict at API (ms)':<22}{'-':>12}{to_json * 1000:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark the vectorized Critic/Guardian scorer against the per-item loops.
+
+Checks that both produce identical analysis before timing them; the
+per-item reference loops live in tests/test_scoring.py.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scoring
+"""
+
+import time
+
+from app.agents.scoring import product_arrays, critic_scores, guardian_scores
+from tests.test_scoring import (
+    make_products, check_equivalence, reference_critic, reference_guardian,
+    vectorized_critic, vectorized_guardian
+)
+
+SIZES = [8, 100, 1000, 10000]
+REPEATS = 20
+BUDGET = 1500
+
+def best_of(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    check_equivalence()
+    print("Equivalence check passed.\n")
+    print("loop:   per-item critic + guardian loops")
+    print("batch:  vectorized scorer incl. array extraction and record output (flags memoized)")
+    print("kernel: vectorized scorer on precomputed arrays only\n")
+    print(f"{'n':>7}  {'loop (ms)':>10}  {'batch (ms)':>10}  {'kernel (ms)':>11}  {'batch speedup':>13}")
+    for n in SIZES:
+        products = make_products(n)
+        prices, repairability, flags = product_arrays(products)
+        loop = best_of(lambda: (reference_critic(products, BUDGET), reference_guardian(products)))
+        batch = best_of(lambda: (vectorized_critic(products, BUDGET), vectorized_guardian(products)))
+        kernel = best_of(lambda: (critic_scores(prices, repairability, flags, BUDGET), guardian_scores(repairability)))
+        print(f"{n:>7}  {loop * 1000:>10.3f}  {batch * 1000:>10.3f}  {kernel * 1000:>11.3f}  {loop / batch:>12.2f}x")
+
+if __name__ == "__main__":
+    main()
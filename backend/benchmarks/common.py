@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark, stub server and load generator"""
+
+import json
+from typing import List, Dict, Any, Optional
+
+from app.services.search_cache import normalize_query
+
+SERPAPI_FIXTURES = "benchmarks/fixtures/serpapi_shopping.json"
+
+class SerpApiFixtures:
+    """Recorded Google Shopping responses, looked up by query"""
+
+    def __init__(self, path: str = SERPAPI_FIXTURES):
+        with open(path) as f:
+            self.responses = {normalize_query(q): data for q, data in json.load(f).items()}
+        self.fallback = next(iter(self.responses.values()))
+
+    def lookup(self, query: str) -> Dict[str, Any]:
+        query = normalize_query(query)
+        # Scout may append premium keywords; match the recorded query it starts with
+        return next(
+            (d for q, d in self.responses.items() if query == q or query.startswith(q + " ")),
+            self.fallback
+        )
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p90/p99/max in milliseconds (nearest-rank)"""
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(50),
+        "p90_ms": rank(90),
+        "p99_ms": rank(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,165 @@
+"""
+Compare incremental onboarding extraction against full-transcript extraction.
+
+Replays recorded conversations turn by turn, the way /onboarding/chat sees
+them, and reports per-field agreement between the final profiles plus the
+prompt size each mode sent. Calls the configured LLM (OPENROUTER_API_KEY),
+or with --fake a deterministic rule-based extractor that reads the same
+prompts, so the replay and merge logic can be checked without a key.
+
+Usage (from backend/):
+    python -m benchmarks.compare_extraction [--fake] [fixtures.json]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from typing import List, Dict, Any, Tuple
+
+from langchain_core.messages import AIMessage
+
+from app.onboarding import chat_agent
+from app.onboarding.chat_agent import (
+    extract_identity_from_conversation, extract_identity_incremental, empty_extraction
+)
+from app.onboarding.fast_extract import pre_extract
+
+DEFAULT_FIXTURES = "benchmarks/fixtures/onboarding_conversations.json"
+
+class PromptMeter:
+    """Wraps the onboarding LLM to count prompt characters sent"""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.chars = 0
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        self.chars += len(prompt if isinstance(prompt, str) else str(prompt))
+        return await self.llm.ainvoke(prompt, *args, **kwargs)
+
+# Answer words the fake extractor maps to profile values
+FAKE_VALUE_WORDS = {
+    "repair": "repairability", "upgrade": "repairability",
+    "sustainability": "sustainability", "sustainable": "sustainability",
+    "performance": "performance", "flimsy": "build quality", "durable": "build quality",
+}
+_EXCHANGE_RE = re.compile(r"^(ASSISTANT|USER): (.*)$", re.MULTILINE)
+
+class FakeExtractionLLM:
+    """
+    Deterministic stand-in for the onboarding LLM.
+
+    Reads each user answer with the rule-based fast-path extractor plus a
+    few value keywords. A full-transcript prompt gets a complete profile
+    (latest budget, first use case, every value); an incremental prompt
+    gets only what the latest answer adds.
+    """
+
+    def answer_fields(self, question: str, answer: str) -> Dict[str, Any]:
+        fields, _ = pre_extract(answer, question)
+        words = answer.lower()
+        values = [v for w, v in FAKE_VALUE_WORDS.items() if w in words]
+        if values:
+            fields["values"] = list(dict.fromkeys(values))
+        return fields
+
+    def exchanges(self, text: str) -> List[Tuple[str, str]]:
+        question, pairs = "", []
+        for role, content in _EXCHANGE_RE.findall(text):
+            if role == "ASSISTANT":
+                question = content
+            else:
+                pairs.append((question, content))
+        return pairs
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        if "Latest exchange:" in prompt:
+            (question, answer), = self.exchanges(prompt.split("Latest exchange:", 1)[1])
+            return AIMessage(content=json.dumps(self.answer_fields(question, answer)))
+
+        profile = empty_extraction()
+        profile["use_case"] = ""
+        for question, answer in self.exchanges(prompt.split("Conversation:", 1)[1]):
+            fields = self.answer_fields(question, answer)
+            if "budget_preferred" in fields:
+                profile["budget_preferred"] = fields["budget_preferred"]
+                profile["budget_maximum"] = fields.get("budget_maximum", 0)
+            if fields.get("use_case") and not profile["use_case"]:
+                profile["use_case"] = fields["use_case"]
+            profile["values"] += [v for v in fields.get("values", []) if v not in profile["values"]]
+        return AIMessage(content=json.dumps(profile))
+
+def jaccard(a: List[Any], b: List[Any]) -> float:
+    a = {str(x).lower() for x in a or []}
+    b = {str(x).lower() for x in b or []}
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def compare(full: Dict[str, Any], incremental: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "budget_preferred": full.get("budget_preferred") == incremental.get("budget_preferred"),
+        "budget_maximum": full.get("budget_maximum") == incremental.get("budget_maximum"),
+        "use_case_present": bool(full.get("use_case")) == bool(incremental.get("use_case")),
+        "interests_jaccard": round(jaccard(full.get("interests"), incremental.get("interests")), 2),
+        "values_jaccard": round(jaccard(full.get("values"), incremental.get("values")), 2),
+        "priorities_jaccard": round(jaccard(full.get("priorities"), incremental.get("priorities")), 2),
+    }
+
+async def replay(messages: List[Dict[str, str]], meter: PromptMeter) -> Dict[str, Any]:
+    """Run both modes over every user turn, as the endpoint would"""
+    full_chars = incremental_chars = 0
+    full = partial = None
+
+    for i, msg in enumerate(messages):
+        if msg["role"] != "user":
+            continue
+        history = messages[:i]
+
+        meter.chars = 0
+        full = await extract_identity_from_conversation(history + [msg])
+        full_chars += meter.chars
+
+        meter.chars = 0
+        if partial is None:
+            partial = await extract_identity_from_conversation(history + [msg])
+        else:
+            last_question = next(
+                (m["content"] for m in reversed(history) if m["role"] == "assistant"), ""
+            )
+            partial = await extract_identity_incremental(partial, last_question, msg["content"])
+        incremental_chars += meter.chars
+
+    return {
+        "full": full,
+        "incremental": partial,
+        "agreement": compare(full, partial),
+        "prompt_chars": {"full": full_chars, "incremental": incremental_chars},
+    }
+
+async def compare_fixtures(path: str, llm) -> Dict[str, Any]:
+    with open(path) as f:
+        conversations = json.load(f)
+
+    meter = PromptMeter(llm)
+    original, chat_agent.llm = chat_agent.llm, meter
+    try:
+        return {
+            conversation["name"]: await replay(conversation["messages"], meter)
+            for conversation in conversations
+        }
+    finally:
+        chat_agent.llm = original
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="?", default=DEFAULT_FIXTURES)
+    parser.add_argument("--fake", action="store_true", help="use the deterministic rule-based extractor")
+    args = parser.parse_args(argv)
+
+    llm = FakeExtractionLLM() if args.fake else chat_agent.llm
+    print(json.dumps(asyncio.run(compare_fixtures(args.fixtures, llm)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Open-loop load generator for a running backend.
+
+Fires requests at a fixed rate regardless of how fast earlier ones finish,
+so queueing shows up as latency instead of silently lowering the offered
+load. Reports status counts, percentiles and a latency histogram, and can
+write them as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.loadgen [--target http://127.0.0.1:8000]
+        [--endpoint chat|batch|onboarding] [--rps 10] [--duration 30]
+        [--max-in-flight 200] [--output results.json]
+
+Pair with benchmarks.stub_server to load-test without OpenRouter/SerpAPI quota.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from typing import List, Dict, Any
+
+import httpx
+
+from benchmarks.common import percentiles
+
+IDENTITY = {
+    "role": "Software Developer",
+    "budget": {"preferred": 1200, "maximum": 1500},
+    "values": ["repairability", "performance"],
+}
+CHAT_QUERIES = [
+    "laptop for coding",
+    "gaming monitor",
+    "mechanical keyboard",
+    "noise cancelling headphones",
+    "smartphone with good camera",
+]
+ONBOARDING_TURNS = [
+    ([], "I need a laptop for coding"),
+    ([{"role": "assistant", "content": "What's your budget?"}], "around $1200, max 1500"),
+    ([{"role": "assistant", "content": "What matters most to you in a laptop?"}], "repairability and a good keyboard"),
+]
+
+def chat_payload(i: int, unique: bool) -> Dict[str, Any]:
+    query = CHAT_QUERIES[i % len(CHAT_QUERIES)]
+    # A unique suffix defeats the /chat response cache
+    return {"message": f"{query} #{i}" if unique else query, "identity": IDENTITY}
+
+def batch_payload(i: int, unique: bool) -> Dict[str, Any]:
+    # Three consecutive queries, as a comparison page would send them
+    queries = [CHAT_QUERIES[(i + j) % len(CHAT_QUERIES)] for j in range(3)]
+    if unique:
+        queries = [f"{q} #{i}" for q in queries]
+    return {"queries": queries, "identity": IDENTITY}
+
+def onboarding_payload(i: int, unique: bool) -> Dict[str, Any]:
+    history, message = ONBOARDING_TURNS[i % len(ONBOARDING_TURNS)]
+    return {"conversation_history": history, "user_message": message}
+
+ENDPOINTS = {
+    "chat": ("/chat", chat_payload),
+    "batch": ("/chat/batch", batch_payload),
+    "onboarding": ("/onboarding/chat", onboarding_payload),
+}
+
+def histogram(samples: List[float], buckets: int = 12) -> List[Dict[str, Any]]:
+    """Log-spaced latency buckets (ms) with counts"""
+    if not samples:
+        return []
+    ms = [s * 1000 for s in samples]
+    low, high = max(min(ms), 0.1), max(ms)
+    if high <= low:
+        return [{"le_ms": round(high, 1), "count": len(ms)}]
+    ratio = (high / low) ** (1 / buckets)
+    bounds = [low * ratio ** (i + 1) for i in range(buckets)]
+    bounds[-1] = high
+    counts = [0] * buckets
+    for value in ms:
+        index = min(buckets - 1, max(0, math.ceil(math.log(max(value, low) / low, ratio)) - 1))
+        counts[index] += 1
+    return [{"le_ms": round(b, 1), "count": c} for b, c in zip(bounds, counts)]
+
+def print_histogram(rows: List[Dict[str, Any]], width: int = 40):
+    peak = max((r["count"] for r in rows), default=0) or 1
+    for row in rows:
+        bar = "#" * round(row["count"] / peak * width)
+        print(f"  <= {row['le_ms']:>9.1f} ms | {bar:<{width}} {row['count']}", file=sys.stderr)
+
+async def run(args) -> Dict[str, Any]:
+    path, make_payload = ENDPOINTS[args.endpoint]
+    total = int(args.rps * args.duration)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    dropped = 0
+    in_flight = 0
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+
+        async def one(i: int):
+            nonlocal in_flight
+            in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=make_payload(i, args.unique))
+                statuses[str(response.status_code)] += 1
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            finally:
+                in_flight -= 1
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            # Schedule against the start time so send jitter doesn't accumulate
+            delay = start + i / args.rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight >= args.max_in_flight:
+                dropped += 1
+                continue
+            tasks.append(asyncio.create_task(one(i)))
+        send_elapsed = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "target": args.target,
+        "endpoint": path,
+        "offered_rps": args.rps,
+        "achieved_send_rps": round(len(tasks) / send_elapsed, 2) if send_elapsed else None,
+        "completed_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "sent": len(tasks),
+        "dropped": dropped,
+        "statuses": dict(statuses),
+        "latency": percentiles(latencies),
+        "histogram": histogram(latencies),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="chat")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="requests beyond this are dropped, not queued")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--unique", action="store_true", help="vary /chat messages to bypass the response cache")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"{results['endpoint']}: sent {results['sent']} at {results['achieved_send_rps']} req/s, "
+          f"dropped {results['dropped']}, statuses {results['statuses']}", file=sys.stderr)
+    print(f"latency (200s): {results['latency']}", file=sys.stderr)
+    print_histogram(results["histogram"])
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Local stand-in for OpenRouter and SerpAPI, for load testing without quota.
+
+Serves OpenAI-style chat completions (streaming and non-streaming, plus
+tool calls for structured output) and Google Shopping JSON from the
+recorded fixtures, with configurable latency and error-rate
+distributions. Point the backend at it with:
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8900/api/v1
+    SERPAPI_URL=http://127.0.0.1:8900/search
+
+Usage (from backend/):
+    python -m benchmarks.stub_server [--port 8900]
+        [--llm-latency lognormal:400,0.4] [--llm-error-rate 0.01]
+        [--serp-latency uniform:100,300] [--serp-error-rate 0.02]
+
+Latency specs (milliseconds): fixed:MS, uniform:LOW,HIGH, normal:MEAN,SD,
+lognormal:MEDIAN,SIGMA.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Dict, Any, List, Callable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+from benchmarks.common import SerpApiFixtures, SERPAPI_FIXTURES
+
+ERROR_STATUSES = [429, 500, 502, 503]
+
+MENTOR_REPLY = (
+    "Here is how these options line up with what you asked for:\n\n"
+    "- **Best overall**: strong value score and a repairability rating that fits your priorities.\n"
+    "- **Budget pick**: covers the essentials and leaves room in your budget.\n"
+    "- **Performance pick**: the fastest option here if you can stretch a little."
+)
+
+# Returned for prompts asking for JSON, and used to fill tool-call arguments
+EXTRACTION = {
+    "use_case": "a laptop for coding",
+    "interests": ["programming", "linux"],
+    "values": ["repairability", "performance"],
+    "budget_preferred": 1200,
+    "budget_maximum": 1500,
+    "priorities": ["keyboard", "battery life"],
+    "next_question": "What will you mostly use it for day to day?",
+}
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency spec in milliseconds -> sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise argparse.ArgumentTypeError(f"unknown latency spec: {spec!r}")
+
+class Upstream:
+    """Latency and error behaviour of one stubbed upstream"""
+
+    def __init__(self, latency: str, error_rate: float, rng: random.Random):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rng = rng
+        self.requests = 0
+        self.errors = 0
+
+    async def delay(self, fraction: float = 1.0):
+        await asyncio.sleep(self.sample_latency(self.rng) * fraction)
+
+    def maybe_error(self) -> Optional[JSONResponse]:
+        self.requests += 1
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            status = self.rng.choice(ERROR_STATUSES)
+            return JSONResponse({"error": {"message": "stub upstream error", "code": status}}, status_code=status)
+        return None
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+BATCH_SECTION_RE = re.compile(r"^\s*(\[\[SECTION \d+\]\])\s*$", re.MULTILINE)
+
+def reply_for(body: Dict[str, Any]) -> str:
+    prompt = prompt_text(body.get("messages", []))
+    markers = BATCH_SECTION_RE.findall(prompt)
+    if markers:
+        # Batch Mentor prompt: one reply section per query marker
+        return "\n\n".join(f"{marker}\n{MENTOR_REPLY}" for marker in markers)
+    if "JSON" in prompt:
+        return json.dumps({k: v for k, v in EXTRACTION.items() if k != "next_question"})
+    if "follow-up question" in prompt.lower() or "next question" in prompt.lower():
+        return EXTRACTION["next_question"]
+    return MENTOR_REPLY
+
+def tool_arguments(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments for a tool call, from the canned extraction or type defaults"""
+    defaults = {"string": "", "integer": 0, "number": 0, "boolean": False, "array": [], "object": {}}
+    properties = tool.get("function", {}).get("parameters", {}).get("properties", {})
+    arguments = {}
+    for name, schema in properties.items():
+        if name in EXTRACTION:
+            arguments[name] = EXTRACTION[name]
+        else:
+            kind = schema.get("type") or next((s.get("type") for s in schema.get("anyOf", []) if s.get("type") != "null"), "string")
+            arguments[name] = defaults.get(kind)
+    return arguments
+
+def count_tokens(text: str) -> int:
+    # Rough whitespace count; good enough for token-usage accounting in tests
+    return max(1, len(text.split()))
+
+def create_app(llm: Upstream, serp: Upstream, fixtures: SerpApiFixtures) -> FastAPI:
+    app = FastAPI(title="IdentityCart upstream stub")
+
+    @app.get("/")
+    def stats():
+        return {
+            "llm": {"requests": llm.requests, "errors": llm.errors},
+            "serpapi": {"requests": serp.requests, "errors": serp.errors},
+        }
+
+    @app.get("/search")
+    async def search(request: Request):
+        error = serp.maybe_error()
+        await serp.delay()
+        if error:
+            return error
+        return fixtures.lookup(request.query_params.get("q", ""))
+
+    @app.post("/api/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = llm.maybe_error()
+        if error:
+            await llm.delay()
+            return error
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+        prompt_tokens = count_tokens(prompt_text(body.get("messages", [])))
+
+        tools = body.get("tools") or []
+        if tools:
+            tool = tools[0]
+            choice = body.get("tool_choice")
+            if isinstance(choice, dict):
+                wanted = choice.get("function", {}).get("name")
+                tool = next((t for t in tools if t.get("function", {}).get("name") == wanted), tool)
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {
+                        "name": tool.get("function", {}).get("name", "tool"),
+                        "arguments": json.dumps(tool_arguments(tool)),
+                    },
+                }],
+            }
+            completion_tokens = count_tokens(message["tool_calls"][0]["function"]["arguments"])
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": reply_for(body)}
+            completion_tokens = count_tokens(message["content"])
+            finish_reason = "stop"
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if not body.get("stream"):
+            await llm.delay()
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+
+        def chunk(delta: Dict[str, Any], finish=None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            # Half the latency before the first token, the rest spread over the reply
+            await llm.delay(0.5)
+            if tools:
+                yield chunk({"role": "assistant", **{k: v for k, v in message.items() if k != "role"}})
+            else:
+                words = message["content"].split(" ")
+                step_delay = llm.sample_latency(llm.rng) * 0.5 / len(words)
+                for i, word in enumerate(words):
+                    delta = {"content": word if i == len(words) - 1 else word + " "}
+                    if i == 0:
+                        delta["role"] = "assistant"
+                    yield chunk(delta)
+                    await asyncio.sleep(step_delay)
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--fixtures", default=SERPAPI_FIXTURES)
+    parser.add_argument("--llm-latency", default="lognormal:400,0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--serp-latency", default="uniform:100,300")
+    parser.add_argument("--serp-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    app = create_app(
+        Upstream(args.llm_latency, args.llm_error_rate, rng),
+        Upstream(args.serp_latency, args.serp_error_rate, rng),
+        SerpApiFixtures(args.fixtures),
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
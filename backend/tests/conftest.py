@@ -0,0 +1,4 @@
+import os
+
+# The LLM clients are built at import time and need a key, even when faked
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
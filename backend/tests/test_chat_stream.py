@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import httpx
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+import app.agents.graph as graph_module
+from app.main import app
+from app.services import product_search
+from app.services.records import Product
+from app.services.response_cache import response_cache
+
+REPLY = "The ThinkPad is the best fit for coding on your budget."
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_stream_sends_mentor_reply_once(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+    monkeypatch.setattr(graph_module, "llm", GenericFakeChatModel(messages=iter([AIMessage(content=REPLY)])))
+
+    async def find_products(query, max_results=10):
+        return [Product(id="p1", name="Lenovo ThinkPad laptop", price=900, rating=4.5, reviews=100)]
+    monkeypatch.setattr(product_search, "find_products", find_products)
+    response_cache.clear()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/chat/stream", json={
+                "message": "laptop for coding",
+                "identity": {"role": "Software Developer", "budget": 1000}
+            })
+
+    response = asyncio.run(run())
+    events = parse_events(response.text)
+    tokens = [data["content"] for event, data in events if event == "token"]
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == REPLY
+    assert events[-1] == ("done", {"final_response": REPLY})
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.agents.debate_manager import DebateManager
+from app.agents.debate_types import ProductProposal, ProductChallenge
+from app.services.identity import compile_identity
+from app.services.records import Product
+
+def make_challenged():
+    product = Product(id="p1", name="Framework Laptop 13", price=999.0)
+    challenged = []
+    for index, agent in enumerate(["Scout", "Guardian"]):
+        proposal = ProductProposal(
+            product_id="p1", product=product, proposing_agent=agent,
+            reasons=[f"{agent} likes it"], confidence=0.8
+        )
+        challenge = ProductChallenge(
+            product_id="p1", challenging_agent="Critic", reason="Pricey", severity="minor"
+        )
+        challenged.append((index, proposal, [challenge]))
+    return challenged
+
+async def no_limit(coro):
+    return await coro
+
+def test_batched_defenses_keep_duplicate_products_apart():
+    reply = json.dumps({"0": "Scout defends", "1": "Guardian defends"})
+    manager = DebateManager(FakeListChatModel(responses=[reply]))
+    defenses = asyncio.run(
+        manager._get_defenses_batched(make_challenged(), compile_identity({}), no_limit)
+    )
+    assert defenses == {0: "Scout defends", 1: "Guardian defends"}
+
+def test_uncovered_proposals_fall_back_to_individual_defenses():
+    reply = json.dumps({"1": "Guardian defends"})
+    manager = DebateManager(FakeListChatModel(responses=[reply, "Scout alone"]))
+    defenses = asyncio.run(
+        manager._get_defenses_batched(make_challenged(), compile_identity({}), no_limit)
+    )
+    assert defenses == {0: "Scout alone", 1: "Guardian defends"}
@@ -0,0 +1,41 @@
+import asyncio
+from pathlib import Path
+
+from app.onboarding.chat_agent import merge_extraction, empty_extraction
+from benchmarks.compare_extraction import compare_fixtures, FakeExtractionLLM
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "onboarding_conversations.json"
+
+def test_lists_grow_without_duplicates_and_cap_at_five():
+    merged = merge_extraction({"values": ["privacy", "performance"]}, {"values": ["performance", "eco"]})
+    assert merged["values"] == ["privacy", "performance", "eco"]
+    merged = merge_extraction(merged, {"values": ["a", "b", "c", "d"]})
+    assert merged["values"] == ["privacy", "performance", "eco", "a", "b"]
+
+def test_empty_answers_keep_what_we_had():
+    previous = {"use_case": "a laptop for coding", "budget_preferred": 1200, "budget_maximum": 1500}
+    merged = merge_extraction(previous, {
+        "use_case": "general shopping", "budget_preferred": 0, "budget_maximum": None, "interests": [],
+    })
+    assert merged["use_case"] == "a laptop for coding"
+    assert merged["budget_preferred"] == 1200
+    assert merged["budget_maximum"] == 1500
+    assert merged["interests"] == []
+    assert merge_extraction(previous, {"use_case": ""})["use_case"] == "a laptop for coding"
+
+def test_new_scalars_replace_old_ones():
+    merged = merge_extraction({"budget_preferred": 2000}, {"budget_preferred": 2500, "budget_maximum": 2500})
+    assert merged["budget_preferred"] == 2500
+    assert merged["budget_maximum"] == 2500
+
+def test_unknown_keys_are_dropped():
+    merged = merge_extraction({"name": "Sam", "budget_preferred": 900}, {"next_question": "Why?"})
+    assert set(merged) == set(empty_extraction())
+    assert merged["budget_preferred"] == 900
+
+def test_incremental_replay_matches_full_transcript():
+    results = asyncio.run(compare_fixtures(FIXTURES, FakeExtractionLLM()))
+    assert results
+    for name, result in results.items():
+        assert all(v is True or v == 1.0 for v in result["agreement"].values()), name
+        assert result["incremental"] == result["full"], name
@@ -0,0 +1,49 @@
+from app.onboarding.fast_extract import parse_budget, pre_extract
+
+BUDGET_QUESTION = "What's your budget?"
+
+def test_spec_numbers_are_not_budgets():
+    fields, resolved = pre_extract("16GB ram laptop under $1500")
+    assert fields["budget_preferred"] == 1500
+    assert fields["budget_maximum"] == 1500
+    assert fields["use_case"] == "16GB ram laptop"
+
+def test_units_are_ignored():
+    assert parse_budget("144hz monitor")[0] == {}
+    assert parse_budget("27 inch monitor", BUDGET_QUESTION)[0] == {}
+    assert parse_budget('15.6" laptop for $900')[0] == {"budget_preferred": 900}
+
+def test_bare_number_with_other_words_is_not_a_budget():
+    fields, resolved = pre_extract("I have 2 kids", BUDGET_QUESTION)
+    assert "budget_preferred" not in fields
+    assert not resolved
+
+def test_bare_number_answering_budget_question():
+    fields, resolved = pre_extract("around 1200", BUDGET_QUESTION)
+    assert fields == {"budget_preferred": 1200}
+    assert resolved
+
+def test_marked_amounts_and_ranges():
+    assert parse_budget("$800-1200")[0] == {"budget_preferred": 800, "budget_maximum": 1200}
+    assert parse_budget("1-2k")[0] == {"budget_preferred": 1000, "budget_maximum": 2000}
+    assert parse_budget("about 1,500 dollars")[0] == {"budget_preferred": 1500}
+
+def test_several_amounts_are_left_to_the_llm():
+    assert parse_budget("either $900 or $1200")[0] == {}
+
+def test_unparsed_amounts_go_to_the_llm():
+    for message in [
+        "a laptop under 800",
+        "a monitor around 300",
+        "gaming laptop, 2000 max",
+        "a phone, not more than 500",
+    ]:
+        fields, resolved = pre_extract(message)
+        assert "budget_preferred" not in fields, message
+        assert not resolved, message
+
+def test_use_case_drops_the_budget_phrase():
+    fields, resolved = pre_extract("under 1.5k for a gaming laptop")
+    assert fields == {"budget_preferred": 1500, "budget_maximum": 1500, "use_case": "a gaming laptop"}
+    assert resolved
+    assert pre_extract("$1200 max, for a laptop")[0]["use_case"] == "a laptop"
@@ -0,0 +1,108 @@
+"""
+Equivalence of the vectorized Critic/Guardian scorer with the per-item
+loops it replaced in critic_node and guardian_node.
+"""
+
+import random
+from typing import List, Dict, Any
+
+from app.agents.scoring import (
+    product_arrays, repairability_array, critic_scores, guardian_scores, to_analysis
+)
+from app.services.records import Product, ProductAnalysis
+
+NAME_PARTS = [
+    "Apple MacBook Air", "Razer Blade 16", "Sony WH-1000XM5", "Lenovo ThinkPad X1",
+    "HP LaserJet Printer", "Dell XPS 15 2024", "Acer Aspire 5 Renewed", "ASUS ROG latest",
+    "Framework Laptop 13", "Alienware m18 Refurbished", "Samsung Galaxy Book3",
+]
+
+def make_products(n: int, seed: int = 0) -> List[Product]:
+    rng = random.Random(seed)
+    return [
+        Product(
+            id=f"bench-{i}",
+            name=f"{rng.choice(NAME_PARTS)} {rng.randint(1, 200)}",
+            price=round(rng.uniform(50, 4000), 2),
+            repairability_score=rng.randint(1, 10),
+        )
+        for i in range(n)
+    ]
+
+def reference_critic(products: List[Product], budget: int) -> Dict[str, Dict[str, Any]]:
+    """Per-item Critic logic as originally written in critic_node"""
+    analysis = {}
+    for p in products:
+        p_id = p.id
+        analysis[p_id] = {}
+
+        price_ratio = p.price / (budget * 1.2)
+        base_score = max(0, 100 - (price_ratio * 80))
+        repaired_score = (base_score + (p.repairability_score * 2))
+        analysis[p_id]["value_score"] = min(100, int(repaired_score))
+
+        name = p.name.lower()
+        hidden_cost = "Low"
+        if any(b in name for b in ["apple", "macbook", "printer", "subscription"]):
+            hidden_cost = "High"
+        elif any(b in name for b in ["razer", "alienware", "sony"]):
+            hidden_cost = "Medium"
+        analysis[p_id]["hidden_cost_risk"] = hidden_cost
+
+        deal_timing = "Buy Now"
+        if "renewed" in name or "refurbished" in name:
+            deal_timing = "Great Price"
+        elif "2024" in name or "latest" in name:
+            deal_timing = "Wait (New Release)"
+        analysis[p_id]["deal_timing"] = deal_timing
+    return analysis
+
+def reference_guardian(products: List[Product]) -> Dict[str, Dict[str, Any]]:
+    """Per-item Guardian logic as originally written in guardian_node"""
+    analysis = {}
+    for p in products:
+        p_id = p.id
+        analysis[p_id] = {}
+
+        score = p.repairability_score
+        confidence = "Low"
+        if score >= 7: confidence = "High"
+        elif score >= 5: confidence = "Medium"
+        analysis[p_id]["repairability_confidence"] = confidence
+
+        longevity = "3-4 Years"
+        if score >= 8: longevity = "5+ Years (Upgradeable)"
+        elif score <= 3: longevity = "2-3 Years (Disposable)"
+        analysis[p_id]["longevity_score"] = longevity
+    return analysis
+
+def vectorized_critic(products: List[Product], budget: int) -> Dict[str, ProductAnalysis]:
+    prices, repairability, flags = product_arrays(products)
+    return to_analysis(products, critic_scores(prices, repairability, flags, budget))
+
+def vectorized_guardian(products: List[Product]) -> Dict[str, ProductAnalysis]:
+    return to_analysis(products, guardian_scores(repairability_array(products)))
+
+def as_dicts(analysis: Dict[str, ProductAnalysis]) -> Dict[str, Dict[str, Any]]:
+    return {p_id: record.to_dict() for p_id, record in analysis.items()}
+
+def check_equivalence():
+    for seed in range(5):
+        products = make_products(2000, seed)
+        for budget in (300, 1000, 1500, 5000):
+            assert as_dicts(vectorized_critic(products, budget)) == reference_critic(products, budget), \
+                f"critic mismatch (seed={seed}, budget={budget})"
+        assert as_dicts(vectorized_guardian(products)) == reference_guardian(products), \
+            f"guardian mismatch (seed={seed})"
+
+def test_vectorized_scores_match_per_item_loops():
+    check_equivalence()
+
+def test_boundary_scores():
+    # Exact thresholds and prices on and around the budget
+    products = [
+        Product(id=f"edge-{score}-{price}", name="Generic Laptop", price=price, repairability_score=score)
+        for score in (0, 3, 4, 5, 7, 8, 10) for price in (0.0, 1000.0, 1200.0, 1500.0)
+    ]
+    assert as_dicts(vectorized_critic(products, 1000)) == reference_critic(products, 1000)
+    assert as_dicts(vectorized_guardian(products)) == reference_guardian(products)
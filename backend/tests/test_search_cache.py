@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from app.services.records import Product
+from app.services.search_cache import SearchCache
+
+def make_products():
+    return [Product(id="p1", name="Framework Laptop 13", price=999.0)]
+
+def test_disk_tier_survives_restart_and_is_read_off_loop(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = SearchCache(db_path=db_path)
+    cache.set("us|5|laptop", make_products())
+    cache.flush()
+
+    restarted = SearchCache(db_path=db_path)
+    products = asyncio.run(restarted.aget("us|5|laptop"))
+    assert [p.id for p in products] == ["p1"]
+    assert restarted.disk_hits == 1
+    assert asyncio.run(restarted.aget("us|5|desk")) is None
+    assert restarted.misses == 1
+
+def test_expired_rows_are_pruned_by_the_writer(tmp_path):
+    cache = SearchCache(ttl=0.01, db_path=str(tmp_path / "cache.sqlite3"), prune_interval=0)
+    cache.set("old", make_products())
+    cache.flush()
+    time.sleep(0.02)
+    cache.set("new", make_products())
+    cache.flush()
+    keys = [row[0] for row in cache._db.execute("SELECT key FROM search_cache")]
+    assert keys == ["new"]
@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+
+from app.services import product_search
+from app.services.search_cache import search_cache
+
+SERPAPI_RESPONSE = {
+    "shopping_results": [
+        {"position": 1, "title": "Lenovo ThinkPad X1 Carbon 16GB RAM 512GB SSD", "price": "$1,299.00"}
+    ]
+}
+
+def test_follower_survives_leader_cancellation(monkeypatch):
+    monkeypatch.setattr(product_search, "SERPAPI_KEY", "test")
+    monkeypatch.setattr(product_search, "_request_semaphore", None)
+    monkeypatch.setattr(search_cache, "max_size", 0)
+    search_cache.clear()
+
+    async def run():
+        calls = 0
+        release = asyncio.Event()
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                # The leader's request hangs until it is cancelled
+                await release.wait()
+            return httpx.Response(200, json=SERPAPI_RESPONSE)
+
+        monkeypatch.setattr(product_search, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        leader = asyncio.create_task(product_search.search_products_async("laptop"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(product_search.search_products_async("laptop"))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        products = await asyncio.wait_for(follower, timeout=2)
+        await product_search.close_search_client()
+        return leader, products, calls
+
+    leader, products, calls = asyncio.run(run())
+    assert leader.cancelled()
+    assert [p.name for p in products] == ["Lenovo ThinkPad X1 Carbon 16GB RAM 512GB SSD"]
+    assert calls == 2
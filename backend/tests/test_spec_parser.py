@@ -0,0 +1,27 @@
+from app.services.product_search import extract_specs
+from app.services.spec_parser import parse_spec_values, parse_spec_requirements, meets_requirements
+
+def spec_values_for(title):
+    return parse_spec_values(extract_specs({"title": title}), title)
+
+def test_ram_listed_before_storage():
+    values = spec_values_for("Dell XPS 15 16GB RAM 512GB SSD Laptop")
+    assert values["memory_gb"] == 16
+    assert values["storage_gb"] == 512
+    assert meets_requirements(values, parse_spec_requirements("laptop 512gb ssd"))
+
+def test_storage_listed_before_ram():
+    values = spec_values_for('HP Pavilion 15.6" 512GB SSD 8GB RAM')
+    assert values["memory_gb"] == 8
+    assert values["storage_gb"] == 512
+    assert not meets_requirements(values, parse_spec_requirements("laptop 16gb ram"))
+
+def test_terabyte_storage_and_ddr_memory():
+    values = spec_values_for("Lenovo Legion 5 32GB DDR5 RAM 1TB NVMe SSD")
+    assert values["memory_gb"] == 32
+    assert values["storage_gb"] == 1024
+
+def test_unlabelled_sizes_are_left_unset():
+    values = spec_values_for("Acer Aspire 5 8GB 256GB Laptop")
+    assert "memory_gb" not in values
+    assert "storage_gb" not in values
@@ -0,0 +1,137 @@
+"""
+Parity of the single-pass title classifier with the per-list keyword scans
+it replaced, on catalog titles plus synthetic ones built from every lexicon.
+"""
+
+import json
+import random
+import re
+from pathlib import Path
+from typing import List
+
+from app.services.title_classifier import (
+    classify_title, CATEGORY_KEYWORDS, LAPTOP_BOOK_KEYWORDS, TAG_KEYWORDS,
+    REPAIRABILITY_TIERS, HIDDEN_COST_KEYWORDS, DEAL_FLAG_KEYWORDS, COGNITIVE_KEYWORDS
+)
+
+CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "products.json"
+
+FILLER = ["Edition", "2023", "16GB", "512GB", "Black", "with", "Case", "Bundle", "New", "Slim", "X", "Plus"]
+
+# Frozen copies of the per-list scans the classifier replaced. They keep
+# their own keyword lists so a lexicon edit cannot hide a behaviour change.
+
+REFERENCE_CATEGORIES = [
+    ("laptop", ["laptop", "macbook", "thinkpad", "chromebook", "notebook", "surface"]),
+    ("desktop", ["desktop", "gaming pc", "tower", "computer", "ibuypower", "cyberpower", "alienware", "mac studio", "mini"]),
+    ("audio", ["headphone", "earbuds", "airpods", "speaker", "headset"]),
+    ("peripherals", ["keyboard", "mouse", "monitor", "webcam"]),
+    ("phone", ["phone", "iphone", "galaxy", "pixel", "android"]),
+    ("wearable", ["watch", "wearable"]),
+    ("camera", ["camera", "dslr", "mirrorless"]),
+    ("tv", ["tv", "television", "oled"]),
+]
+
+REFERENCE_FLAG_PATTERNS = [
+    (1, re.compile("apple|macbook|printer|subscription")),
+    (2, re.compile("razer|alienware|sony")),
+    (4, re.compile("renewed|refurbished")),
+    (8, re.compile("2024|latest")),
+]
+
+def reference_category(title: str) -> str:
+    """Original categorize_product"""
+    title_lower = title.lower()
+    if "galaxy book" in title_lower or "surface book" in title_lower or "zenbook" in title_lower:
+        return "laptop"
+    for category, keywords in REFERENCE_CATEGORIES:
+        if any(k in title_lower for k in keywords):
+            return category
+    return "electronics"
+
+def reference_tags(title: str) -> List[str]:
+    """Original generate_tags"""
+    tags = []
+    title_lower = title.lower()
+    if "pro" in title_lower or "premium" in title_lower or "ultra" in title_lower or "max" in title_lower:
+        tags.append("premium")
+    if "gaming" in title_lower or "rgb" in title_lower or "rtx" in title_lower:
+        tags.append("gaming")
+    if "wireless" in title_lower or "bluetooth" in title_lower:
+        tags.append("wireless")
+    if "eco" in title_lower or "sustainable" in title_lower:
+        tags.append("eco-friendly")
+    return tags
+
+def reference_repairability(title: str) -> int:
+    """Original calculate_repairability"""
+    title_lower = title.lower()
+    if any(brand in title_lower for brand in ["framework", "fairphone", "system76"]):
+        return 9
+    if any(brand in title_lower for brand in ["thinkpad", "elitebook", "latitude", "dell", "lenovo"]):
+        return 7
+    if any(brand in title_lower for brand in ["asus", "acer", "hp", "msi", "samsung"]):
+        return 6
+    if any(brand in title_lower for brand in ["macbook", "apple", "ipad", "iphone", "surface", "microsoft"]):
+        return 3
+    if any(word in title_lower for word in ["airpods", "buds", "disposable"]):
+        return 1
+    return 5
+
+def reference_hidden_cost(title: str) -> str:
+    """Critic's original hidden-cost scan"""
+    name = title.lower()
+    if any(b in name for b in ["apple", "macbook", "printer", "subscription"]):
+        return "High"
+    elif any(b in name for b in ["razer", "alienware", "sony"]):
+        return "Medium"
+    return "Low"
+
+def reference_name_flags(title: str) -> int:
+    """Original scoring.name_flags, without its lru_cache"""
+    name = title.lower()
+    mask = 0
+    for flag, pattern in REFERENCE_FLAG_PATTERNS:
+        if pattern.search(name):
+            mask |= flag
+    return mask
+
+def reference_cognitive_hint(title: str):
+    """Mentor's original cognitive-load keyword scan"""
+    name = title.lower()
+    if "pro" in name or "developer" in name or "linux" in name:
+        return "technical"
+    elif "macbook" in name or "console" in name or "iphone" in name:
+        return "simple"
+    return None
+
+def make_titles(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = list(LAPTOP_BOOK_KEYWORDS) + FILLER
+    for group in (CATEGORY_KEYWORDS, TAG_KEYWORDS, REPAIRABILITY_TIERS, HIDDEN_COST_KEYWORDS,
+                  DEAL_FLAG_KEYWORDS, COGNITIVE_KEYWORDS):
+        for _, words in group:
+            vocabulary.extend(words)
+
+    with open(CATALOG_PATH) as f:
+        titles = [p["name"] for p in json.load(f)]
+    while len(titles) < n:
+        words = rng.sample(vocabulary, rng.randint(2, 7))
+        # Glue some words together so keywords also appear inside other words
+        title = "".join(w if rng.random() < 0.2 else " " + w for w in words).strip()
+        titles.append(title.title() if rng.random() < 0.5 else title)
+    return titles
+
+def check_parity(titles: List[str]):
+    for title in titles:
+        profile = classify_title(title)
+        assert profile.category == reference_category(title), f"category mismatch: {title!r}"
+        assert list(profile.tags) == reference_tags(title), f"tags mismatch: {title!r}"
+        assert profile.repairability == reference_repairability(title), f"repairability mismatch: {title!r}"
+        assert profile.hidden_cost == reference_hidden_cost(title), f"hidden cost mismatch: {title!r}"
+        # The classifier sets one hidden-cost bit (High wins), which Critic reads the same way
+        assert profile.flags & ~3 == reference_name_flags(title) & ~3, f"deal flags mismatch: {title!r}"
+        assert profile.cognitive_hint == reference_cognitive_hint(title), f"cognitive hint mismatch: {title!r}"
+
+def test_classifier_matches_original_scans():
+    check_parity(make_titles(5000))
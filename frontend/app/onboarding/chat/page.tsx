@@ -53,7 +53,9 @@ export default function OnboardingChatPage() {
                         role: m.role,
                         content: m.content
                     })),
-                    user_message: input
+                    user_message: input,
+                    // Lets the backend merge only the new exchange into what it already knows
+                    partial_data: partialData
                 })
             })
 